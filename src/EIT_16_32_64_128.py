@@ -12,8 +12,14 @@ from .com_util import (
     split_bursts_in_frames,
 )
 
+import os
 import numpy as np
-from pyftdi.ftdi import Ftdi
+from datetime import datetime as dt
+from typing import Union
+try:
+    from pyftdi.ftdi import Ftdi
+except ImportError:
+    print("Could not import module: pyftdi")
 
 
 msg_dict = {
@@ -29,6 +35,9 @@ msg_dict = {
 }
 
 from .sciopy_dataclasses import EitMeasurementSetup
+from .doteit import DotEitStreamWriter
+from .background_writer import BackgroundWriter
+from .injection_patterns import get_v_without_ext, injection_pattern
 
 
 class EIT_16_32_64_128:
@@ -318,10 +327,12 @@ class EIT_16_32_64_128:
         assert setup.n_el == self.n_el, print(
             "Number of electrodes in setup configuration must match Eit_16_32_64_128() initialization."
         )
-        el_inj = np.arange(1, setup.n_el + 1)
-        el_gnd = np.roll(el_inj, -(setup.inj_skip + 1))
-        for v_el, g_el in zip(el_inj, el_gnd):
-            self.write_command_string(bytearray([0xB0, 0x03, 0x06, v_el, g_el, 0xB0]))
+        # all injections are uploaded as one batched command sequence
+        self.injection_pattern = injection_pattern(setup.n_el, setup.inj_skip)
+        commands = bytearray()
+        for v_el, g_el in self.injection_pattern:
+            commands.extend(bytearray([0xB0, 0x03, 0x06, v_el, g_el, 0xB0]))
+        self.write_command_string(commands)
 
         self.print_msg = True
         # Set output configuration - enable all
@@ -396,10 +407,35 @@ class EIT_16_32_64_128:
             return data
         elif return_as == "pot_mat":
             return self.get_data_as_matrix()
+        elif return_as == "v_without_ext":
+            return get_v_without_ext(self.get_data_as_matrix(), self.setup.inj_skip)
+
+    def run_acquisition(self, n_measurements: int, writer: Union[BackgroundWriter, list]) -> None:
+        """
+        Repeats StartStopMeasurement and hands every potential matrix to a BackgroundWriter,
+        so saving does not add to the acquisition cycle time.
+        Several consumers, e.g. a BackgroundWriter and a reconstruction.ReconstructionStage,
+        can be passed as a list. To stream .eit files, pass doteit_stream(), or
+        BackgroundWriter(self.doteit_stream(...).submit) to write them off the acquisition thread.
+
+        Parameters
+        ----------
+        n_measurements : int
+            number of measurements
+        writer : Union[BackgroundWriter, list]
+            writer persisting the potential matrices of shape (burst_count, n_el, n_el),
+            or a list of consumers with a submit() method
+        """
+        consumers = writer if isinstance(writer, list) else [writer]
+        for _ in range(n_measurements):
+            pot_mat = self.StartStopMeasurement(return_as="pot_mat")
+            for consumer in consumers:
+                consumer.submit(pot_mat)
 
     def get_data_as_matrix(self):
+        n_inj = len(injection_pattern(self.n_el, self.setup.inj_skip))
         pot_matrix = np.empty(
-            (self.setup.burst_count, self.n_el, self.n_el), dtype=complex
+            (self.setup.burst_count, n_inj, self.n_el), dtype=complex
         )
 
         for b_c, burst in enumerate(self.data):
@@ -419,6 +455,69 @@ class EIT_16_32_64_128:
         self.data = pot_matrix
         return pot_matrix
 
+    def doteit_header(self) -> dict:
+        """
+        Header of the .eit files of the current measurement setup.
+        """
+        return {
+            "file_version_number": 1,
+            "date_time": dt.now().isoformat(),
+            "f_min": self.setup.exc_freq,
+            "f_max": self.setup.exc_freq,
+            "f_scale": 0,
+            "f_count": 1,
+            "current_amplitude": self.setup.amplitude,
+            "framerate": self.setup.framerate,
+            "MeasurementChannels": self.n_el,
+            "MeasurementChannelsIndependentFromInjectionPattern": self.n_el,
+        }
+
+    def doteit_stream(self, s_path: str, setup_name: str = "eit") -> DotEitStreamWriter:
+        """
+        Returns a consumer for run_acquisition that writes every burst as a .eit file while
+        the acquisition runs, so live acquisitions share the doteit pipeline with the vendor
+        software recordings without an export pass.
+
+        Parameters
+        ----------
+        s_path : str
+            save path
+        setup_name : str, optional
+            prefix of the file names and setup_name header field, by default "eit"
+
+        Returns
+        -------
+        DotEitStreamWriter
+            consumer with a submit() method
+        """
+        return DotEitStreamWriter(
+            s_path,
+            self.doteit_header(),
+            injection_pattern(self.n_el, self.setup.inj_skip),
+            setup_name,
+        )
+
+    def write_doteit(self, pot_mat: np.ndarray, s_path: str, setup_name: str = "eit") -> list:
+        """
+        Writes every burst of a potential matrix (see get_data_as_matrix) as a .eit file.
+        For continuous acquisition pass doteit_stream() to run_acquisition instead.
+
+        Parameters
+        ----------
+        pot_mat : np.ndarray
+            potential matrix of shape (burst_count, n_inj, n_el)
+        s_path : str
+            save path
+        setup_name : str, optional
+            prefix of the file names and setup_name header field, by default "eit"
+
+        Returns
+        -------
+        list
+            list of written files
+        """
+        return self.doteit_stream(s_path, setup_name).submit(pot_mat)
+
     def SetOutputConfiguration(self):
         print("TBD")
 
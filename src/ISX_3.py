@@ -3,13 +3,20 @@ try:
 except ImportError:
     print("Could not import module: serial")
 
-from dataclasses import dataclass
-from pyftdi.ftdi import Ftdi
+from dataclasses import dataclass, replace
+try:
+    from pyftdi.ftdi import Ftdi
+except ImportError:
+    print("Could not import module: pyftdi")
 from sciopy_dataclasses import FreqList, EisMeasurementSetup
 from com_util import(
+    TcpDevice,
     clTbt_dp,
     clTbt_sp,
     del_hex_in_list,
+    format_sync_time_to_hex,
+    freq_list_points,
+    parse_eis_frames,
     reshape_full_message_in_bursts,
     split_bursts_in_frames,
     uintTbt,
@@ -18,6 +25,7 @@ import numpy as np
 import itertools
 import struct
 import csv
+import time
 from datetime import datetime as dt
 
 
@@ -45,8 +53,11 @@ class ISX_3:
         self.channel_group = None
         self.print_msg = True
         self.ret_hex_int = None
-        self.sync_time: float = None  # sync time
-
+        self.sync_time: float = None  # sync time in s
+        self.time_stamp_len: int = 0  # length of the time stamp in the measurement data: disabled 0, ms 4, us 5
+        self.current_range_enabled: bool = False  # current range in the measurement data
+        self.current_range_presets: np.ndarray = None  # learned current range per frequency row
+        self.sweep_duration: float = None  # estimated duration of one sweep in s
 
         # HEX FE Setting
         self.hex_measurement_mode: str = None  # 4 point configuration : 0x02, 3 point configuration: 0x03, 2 point configuration: 0x01
@@ -81,14 +92,26 @@ class ISX_3:
         )
         print("Connection to", self.device.name, "is established.")
 
+    def connect_device_TCP(self, host: str, port: int, timeout: float = 1):
+        """
+        Connect via the Ethernet interface.
+        The device answers a new connection with the TCP-Socket message (0x11).
+        """
+        self.serial_protocol = "TCP"
+        self.device = TcpDevice(host=host, port=port, timeout=timeout)
+        print("Connection to", self.device.name, "is established.")
+        self.print_msg = True
+        self.SystemMessageCallback()
+        self.print_msg = False
+
     def SystemMessageCallback(self):
         return self.SystemMessageCallback_usb_fs()
 
     def SystemMessageCallback_usb_fs(self):
         """
-        !Only used if a full-speed connection is established!
-
-        Reads the message buffer of a serial connection. Also prints out the general system message.
+        Reads the message buffer of a full-speed serial connection or a TCP socket until nothing arrives
+        within the read timeout. Everything already received is taken in one read instead of byte by byte.
+        Also prints out the general system message.
         """
         timeout_count = 0
         received = []
@@ -96,7 +119,7 @@ class ISX_3:
         data_count = 0
       
         while True:
-            buffer = self.device.read()
+            buffer = self.device.read(max(self.device.in_waiting, 1))
             if buffer:
                 received.extend(buffer)
                 data_count += len(buffer)
@@ -228,11 +251,29 @@ class ISX_3:
                     0x02], 
                     [EisSetup.time_stamp_ms], 
                     [0x97])))
+
+        def ActivateCurrentRange(EisSetup):
+            """
+            0x04 - Activate current range
+            Adds the current range of every frequency point to the measurement data (1Byte unsigned integer).
+            In case of auto ranging this could change from point to point.
+
+            Syntax
+            [CT] 02 04 [CD] [CT]
+
+            [CD]
+                0x01  Enable current range
+                0x00  Disable current range
+            """
+            return bytearray([0x97, 0x02, 0x04, EisSetup.current_range, 0x97])
             
         self.print_msg = True
         #self.write_command_string(ActivateTimeStampMs(EisSetup))
         self.write_command_string(ActivateTimeStampUs(EisSetup))
+        self.write_command_string(ActivateCurrentRange(EisSetup))
         self.print_msg = False
+        self.time_stamp_len = 5 if EisSetup.time_stamp_ms else 0
+        self.current_range_enabled = bool(EisSetup.current_range)
 
 
     def GetOptions(self):
@@ -338,14 +379,28 @@ class ISX_3:
         self.print_msg = False
 
     def SetFE_Settings(self):
-        
-
+        """
+        0xB0 - Set FE Settings
+        Configures the measurement mode, channel and current range of the front end.
 
+        Syntax
+        [CT] 03 [MeasurementMode] [Channel] [RangeSetting] [CT]
 
+        [RangeSetting]
+            autoranging : 0x00
+            +- 10mA (100) : 0x01
+            +- 100uA (10k) : 0x02
+            +- 1uA (1M) : 0x04
+            +- 10nA (100M) : 0x06
 
+        Returns
+        -------
+        ACK
+        """
         self.print_msg = True
         self.write_command_string(bytearray(
             [0xB0,
+             0x03,
              self.hex_measurement_mode,
              self.hex_measurement_chanel,
              self.hex_range_setting,
@@ -444,6 +499,11 @@ class ISX_3:
         """
         0xB6 - Set Setup
 
+        EisSetup.freq_list can be a single FreqList or a list of FreqList blocks
+        (e.g. linear and logarithmic segments with their own precision, amplitude
+        and point delay). All blocks are uploaded as one batched command sequence
+        after a single Init_Setup, so a composite sweep runs in one measurement.
+
         General syntax
         [CT] [LE] [OB] [CD] [CT]
 
@@ -580,7 +640,7 @@ class ISX_3:
                 clTbt_sp(freq_list.start_freq),
                 clTbt_sp(freq_list.stop_freq),
                 clTbt_sp(freq_list.steps),
-                (clTbt_sp(freq_list.scale)[3:]), #TODO find out why it does not work (always linear)
+                (uintTbt(freq_list.scale)[3:]),
                 clTbt_sp(freq_list.precision),
                 clTbt_sp(freq_list.current_amp),
                 [0x01],
@@ -724,12 +784,24 @@ class ISX_3:
             """
             return(bytearray([0xB6, 0x02, 0x20, 0x01, 0xB6]))
 
-        # self.setup = EisSetup
+        self.setup = EisSetup
+        if isinstance(EisSetup.freq_list, FreqList):
+            freq_blocks = [EisSetup.freq_list]
+        else:
+            freq_blocks = list(EisSetup.freq_list)
+        if len(freq_blocks) == 0:
+            raise ValueError("EisSetup.freq_list must contain at least one FreqList.")
+
+        commands = bytearray(Init_Setup())
+        for freq_block in freq_blocks:
+            commands.extend(Add_Freq_List(freq_block))
+        # Each block carries its own amplitude inside the 0x03 command.
+        # Set_All_Amp would overwrite all rows, so it is only used for a single block.
+        if len(freq_blocks) == 1:
+            commands.extend(Set_All_Amp(freq_blocks[0]))
 
         self.print_msg = True
-        self.write_command_string(Init_Setup())
-        self.write_command_string(Add_Freq_List(EisSetup.freq_list))
-        self.write_command_string(Set_All_Amp(EisSetup.freq_list))
+        self.write_command_string(commands)
         # self.write_command_string(LoadingFromSlot())
         self.print_msg = False  
 
@@ -844,7 +916,7 @@ class ISX_3:
         self.write_command_string(SavingToSlot())
         self.print_msg = False
 
-    def SetSyncTime(self):
+    def SetSyncTime(self, sync_time: float = None):
         """
         Set the synchronization time in us. (Time between the measurement of two spectra)
 
@@ -860,27 +932,40 @@ class ISX_3:
             - Min: 0us
             - Max 180s = 180E6 us (0x0ABA9500)
 
+        Syntax
+        [CT] 04 [Sync time] [CT]
+
+        Parameters
+        ----------
+        sync_time : float, optional
+            sync time in s, by default self.sync_time
 
         Returns
         -------
         ACK
         """
-
-        # TODO: Format sync time to hex as descript above
-
-
-        raise NotImplemented
-        hex_st = format_sync_time_to_hex(self.sync_time)
+        if sync_time is None:
+            sync_time = self.sync_time
+        if sync_time is None:
+            raise ValueError("No sync time defined.")
+        # validate before the attribute changes, an invalid value must not replace a valid one
+        hex_st = format_sync_time_to_hex(sync_time)
+        if self.sweep_duration is not None and sync_time < self.sweep_duration:
+            raise ValueError(
+                f"Sync time {sync_time}s is shorter than the measured sweep duration of {self.sweep_duration:.6f}s."
+            )
+        self.sync_time = sync_time
 
         self.print_msg = True
-        self.write_command_string(bytearray([
-            0xB9,
+        self.write_command_string(bytearray(list(itertools.chain(
+            [0xB9,
+             0x04],
             hex_st,
-            0xB9]))
+            [0xB9]))))
         self.print_msg = False
 
 
-    def GetSyncTime(self):
+    def GetSyncTime(self) -> float:
         """
         Reads the currently configured synchronization time.
 
@@ -892,24 +977,206 @@ class ISX_3:
         -------
         [CT] 04 [Sync time] [CT]
         ACK
+
+        float
+            sync time in s
         """
-        #TODO ?
         self.print_msg = True
-        self.write_command_string(bytearray([0xBA, 0x00, 0xBA]))
+        message = self.write_command_string(bytearray([0xBA, 0x00, 0xBA]))
         self.print_msg = False
+        received = [int(hex_str, 16) for hex_str in message]
+        for i in range(len(received) - 6):
+            if received[i] == 0xBA and received[i + 1] == 0x04 and received[i + 6] == 0xBA:
+                self.sync_time = int.from_bytes(bytes(received[i + 2 : i + 6]), "big") * 1e-6
+                return self.sync_time
+        print("No sync time received.")
+
+    def MeasureSweepDuration(self, EisSetup: EisMeasurementSetup) -> float:
+        """
+        Measures the duration of one spectrum from the device time stamps.
+        The time stamp has to be enabled beforehand (EisSetup.time_stamp_ms = 1 and SetOptions).
 
+        Returns
+        -------
+        float
+            sweep duration in s
+        """
+        if not self.time_stamp_len:
+            raise ValueError(
+                "Time stamp is disabled. Set EisSetup.time_stamp_ms = 1 and call SetOptions first."
+            )
+        unit = 1e-6 if self.time_stamp_len == 5 else 1e-3
+        frames = self.StartMeasure(replace(EisSetup, repeat=1))
+        if len(frames) < 2:
+            raise RuntimeError("At least two frequency points are needed to measure the sweep duration.")
+        timestamps = np.array([frame.timestamp for frame in frames]) * unit
+        point_time = np.median(np.diff(timestamps))
+        # add the duration of the last point, which has no following time stamp
+        self.sweep_duration = float(timestamps[-1] - timestamps[0] + point_time)
+        return self.sweep_duration
+
+    def RunPeriodicSpectra(self, EisSetup: EisMeasurementSetup, period: float, n_spectra: int) -> list:
+        """
+        Host-side scheduler which starts one spectrum every period seconds.
+        If the time stamp is enabled, the start of every spectrum is compared with the device time stamp of
+        its first frequency point. The deviation from the nominal schedule (host latency and clock drift)
+        is subtracted from the next start time; the correction is limited to half a period.
+
+        Every spectrum takes the sweep duration plus the read timeout on the host, so the period has to be
+        longer than that. For tighter spacing use the device-side schedule instead:
+        SetSyncTime(period) and EisSetup.repeat = n_spectra.
+
+        Parameters
+        ----------
+        EisSetup : EisMeasurementSetup
+            measurement setup, one spectrum is measured per period
+        period : float
+            period between the start of two spectra in s
+        n_spectra : int
+            number of spectra
 
-    def SetEthernetConfiguration(self):
-        #0xBD
-        raise NotImplemented
+        Returns
+        -------
+        list
+            list of spectra, each a list of EisFrame
+        """
+        if self.sweep_duration is not None:
+            host_cycle = self.sweep_duration + (getattr(self.device, "timeout", None) or 0)
+            if period < host_cycle:
+                raise ValueError(
+                    f"Period {period}s is shorter than the host cycle of {host_cycle:.6f}s (sweep and read timeout)."
+                    "\n\tUse SetSyncTime and EisSetup.repeat for device-side spacing."
+                )
+        setup = replace(EisSetup, repeat=1)
+        unit = 1e-6 if self.time_stamp_len == 5 else 1e-3
+        spectra = []
+        offset = 0.0
+        device_start = None
+        host_start = time.perf_counter()
+        for k in range(n_spectra):
+            delay = host_start + k * period + offset - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            frames = self.StartMeasure(setup)
+            spectra.append(frames)
+            if not self.time_stamp_len or len(frames) == 0:
+                continue
+            device_time = frames[0].timestamp * unit
+            if device_start is None:
+                device_start = device_time - k * period
+                continue
+            offset -= (device_time - device_start) - k * period
+            # a late host cannot catch up, without the limit the correction would keep growing
+            offset = min(max(offset, -period / 2), period / 2)
+        return spectra
+
+    def SetEthernetConfiguration(self, ip_address: str = None, dhcp: bool = None):
+        """
+        0xBD - Set Ethernet Configuration
+        Use save settings command (0x90) to save these parameters persistent.
+
+        General Syntax
+        [CT] [LE] [OB] [CD] [CT]
+
+        [OB]
+            Static IP address: 0x01
+                [CT] 05 01 [IP] [CT]
+                [IP] 4 Byte, e.g. 192.168.1.2 -> C0 A8 01 02
+            DHCP: 0x03
+                [CT] 02 03 [CD] [CT]
+                [CD] 0x01 enable, 0x00 disable
+
+        Parameters
+        ----------
+        ip_address : str, optional
+            static IP address, e.g. "192.168.1.2"
+        dhcp : bool, optional
+            enable/disable DHCP
+
+        Returns
+        -------
+        ACK
+        """
+        self.print_msg = True
+        if ip_address is not None:
+            ip_bytes = [int(ele) for ele in ip_address.split(".")]
+            if len(ip_bytes) != 4 or not all(0 <= ele <= 255 for ele in ip_bytes):
+                raise ValueError(f"Invalid IP address: {ip_address}")
+            self.write_command_string(bytearray([0xBD, 0x05, 0x01, *ip_bytes, 0xBD]))
+        if dhcp is not None:
+            self.write_command_string(bytearray([0xBD, 0x02, 0x03, int(dhcp), 0xBD]))
+        self.print_msg = False
 
     def GetEthernetConfiguration(self):
-        # 0xBE
-        raise NotImplemented
+        """
+        0xBE - Get Ethernet Configuration
+
+        Syntax
+        [CT] 01 [OB] [CT]
+
+        [OB]
+            IP address: 0x01
+            MAC address: 0x02
+            DHCP: 0x03
+
+        Returns
+        -------
+        [CT] [LE] [OB] [CD] [CT]
+        ACK
+        """
+        self.print_msg = True
+        self.write_command_string(bytearray([0xBE, 0x01, 0x01, 0xBE]))
+        self.write_command_string(bytearray([0xBE, 0x01, 0x02, 0xBE]))
+        self.write_command_string(bytearray([0xBE, 0x01, 0x03, 0xBE]))
+        self.print_msg = False
+
+    def SetTCPWatchdog(self, watchdog_time: int):
+        """
+        0xCF - TCP connection watchdog
+        The device closes the TCP connection if no command arrives within the watchdog time.
+
+        Syntax
+        [CT] 05 01 [Time] [CT]
+
+        [Time]
+            Length: 4 byte
+            Data format: unsigned integer
+            Unit: ms
+            0 disables the watchdog
+
+        Returns
+        -------
+        ACK
+        """
+        self.print_msg = True
+        self.write_command_string(bytearray(list(itertools.chain(
+            [0xCF,
+             0x05,
+             0x01],
+            uintTbt(watchdog_time),
+            [0xCF]))))
+        self.print_msg = False
+
+    def GetTCPWatchdog(self):
+        """
+        0xCF - TCP connection watchdog
+        Reads the currently configured watchdog time.
+
+        Syntax
+        [CT] 01 02 [CT]
+
+        Returns
+        -------
+        [CT] 05 02 [Time] [CT]
+        ACK
+        """
+        self.print_msg = True
+        self.write_command_string(bytearray([0xCF, 0x01, 0x02, 0xCF]))
+        self.print_msg = False
 
     def write_command_string(self, command):
         """
-        Function for writing a command 'bytearray(...)' to the serial port
+        Function for writing a command 'bytearray(...)' to the serial port or TCP socket
         """
         self.device.write(command)
         return self.SystemMessageCallback()
@@ -1066,8 +1333,7 @@ class ISX_3:
             Example: B8 03 01 00 01 B8 - to start a measurement and stop it automatically after one measurement spectra per channel configuration.
 
             """
-            repeat = clTbt_sp(EisSetup.repeat)
-            repeat = repeat[:2]
+            repeat = uintTbt(EisSetup.repeat)[2:]
             
             return (bytearray(list(itertools.chain(
                     [0xB8,
@@ -1099,10 +1365,222 @@ class ISX_3:
         print('Measurement started.')
         data = self.write_command_string(StartMeasurement(EisSetup))
         self.print_msg = False  
+        self.data = parse_eis_frames(data, self.time_stamp_len, self.current_range_enabled)
+        return self.data
+
+    def LearnCurrentRanges(self, EisSetup: EisMeasurementSetup) -> np.ndarray:
+        """
+        Runs one autoranged reference sweep and records the current range the device chose per frequency row.
+        The current range output has to be enabled beforehand (EisSetup.current_range = 1 and SetOptions),
+        because SetOptions causes a reboot of the device.
+
+        If a frequency row is measured several times (repeat > 1), the largest current range is kept.
+
+        Returns
+        -------
+        np.ndarray
+            current range setting (see SetFE_Settings) per frequency row
+        """
+        if not self.current_range_enabled:
+            raise ValueError(
+                "Current range output is disabled. Set EisSetup.current_range = 1 and call SetOptions first."
+            )
+        self.hex_range_setting = 0x00
+        self.SetFE_Settings()
+        self.SetSetup(EisSetup)
+        frames = self.StartMeasure(EisSetup)
+
+        ids = np.array([frame.id for frame in frames])
+        ranges = np.array([frame.current_range for frame in frames])
+        rows, row_idx = np.unique(ids, return_inverse=True)
+        # Larger current ranges have smaller setting codes
+        presets = np.full(len(rows), 0xFF, dtype=np.uint8)
+        np.minimum.at(presets, row_idx, ranges.astype(np.uint8))
+        self.current_range_presets = presets
+        return presets
+
+    def MeasureWithCurrentRangePresets(self, EisSetup: EisMeasurementSetup) -> list:
+        """
+        Repeats a sweep with the current ranges learned by LearnCurrentRanges instead of autoranging.
+        The frequency blocks are split into sub-sweeps of consecutive rows with the same current range,
+        each measured with a fixed range setting.
+
+        The frame ids are the rows of the full setup, as in a single sweep, and autoranging is restored afterwards.
+
+        Returns
+        -------
+        list
+            list of EisFrame of all sub-sweeps in frequency order
+        """
+        if self.current_range_presets is None:
+            raise ValueError("No current range presets. Run LearnCurrentRanges first.")
+        if isinstance(EisSetup.freq_list, FreqList):
+            freq_blocks = [EisSetup.freq_list]
+        else:
+            freq_blocks = list(EisSetup.freq_list)
+        n_rows = sum(int(block.steps) for block in freq_blocks)
+        if n_rows != len(self.current_range_presets):
+            raise ValueError(
+                f"Setup has {n_rows} frequency rows, but {len(self.current_range_presets)} presets were learned."
+            )
+
+        frames = []
+        row = 0
+        for block in freq_blocks:
+            points = freq_list_points(block)
+            block_ranges = self.current_range_presets[row : row + len(points)]
+            # split the block at every change of the current range
+            edges = np.flatnonzero(np.diff(block_ranges)) + 1
+            for start, stop in zip(
+                np.concatenate([[0], edges]), np.concatenate([edges, [len(points)]])
+            ):
+                sub_block = replace(
+                    block,
+                    start_freq=float(points[start]),
+                    stop_freq=float(points[stop - 1]),
+                    steps=int(stop - start),
+                )
+                self.hex_range_setting = int(block_ranges[start])
+                self.SetFE_Settings()
+                self.SetSetup(replace(EisSetup, freq_list=sub_block))
+                # the device numbers the rows of every sub-sweep from the start, shift them to the full setup
+                offset = row + int(start)
+                frames.extend(
+                    replace(frame, id=frame.id + offset) for frame in self.StartMeasure(EisSetup)
+                )
+            row += len(points)
+        # back to autoranging on the device, not only in the attribute
+        self.hex_range_setting = 0x00
+        self.SetFE_Settings()
+        return frames
+
+    def PlanFreqBlocks(
+        self,
+        bands: list,
+        time_budget: float,
+        precisions: tuple = (0.0, 1.0, 2.0, 3.0),
+        point_delays: tuple = (0,),
+        calib_steps: int = 5,
+        calib_repeat: int = 5,
+    ) -> tuple:
+        """
+        Plans precision and point delay per frequency band within a time budget.
+        For every band a short calibration sweep is measured for the candidate settings, starting with the
+        lowest precision and point delay. The relative noise per point (std(Z) / |mean(Z)| over the repeats)
+        is computed on the host and the first setting meeting the target noise is the starting point.
+        While the planned sweep exceeds the time budget, the most expensive block is lowered to a faster
+        calibrated setting, the one with the lowest noise. If even the fastest settings do not fit, the
+        fastest plan is returned; the returned noise levels show what is achievable.
+
+        The time per point is taken from the device time stamps if they are enabled (see SetOptions), otherwise
+        from the host duration of the calibration sweep minus the read timeout that ends every read.
+
+        Parameters
+        ----------
+        bands : list
+            list of (FreqList, target relative noise) tuples
+        time_budget : float
+            maximum duration of one sweep over all planned blocks in s
+        precisions : tuple, optional
+            candidate precisions, by default (0.0, 1.0, 2.0, 3.0)
+        point_delays : tuple, optional
+            candidate point delays, by default (0,)
+        calib_steps : int, optional
+            frequency points per band in the calibration sweep, by default 5
+        calib_repeat : int, optional
+            spectra per calibration sweep, by default 5
+
+        Returns
+        -------
+        tuple
+            list of FreqList blocks, can be passed to SetSetup via EisMeasurementSetup.freq_list,
+            and the achievable relative noise per block from the calibration
+        """
+        def relative_noise(frames) -> np.ndarray:
+            ids = np.array([frame.id for frame in frames])
+            z = np.array([frame.impedance for frame in frames])
+            _, row_idx = np.unique(ids, return_inverse=True)
+            count = np.bincount(row_idx)
+            mean = (np.bincount(row_idx, z.real) + 1j * np.bincount(row_idx, z.imag)) / count
+            var = np.bincount(row_idx, np.abs(z - mean[row_idx]) ** 2) / count
+            return np.sqrt(var) / np.abs(mean)
+
+        def time_per_point(frames, elapsed: float) -> float:
+            if self.time_stamp_len and len(frames) > 1:
+                unit = 1e-6 if self.time_stamp_len == 5 else 1e-3
+                steps = np.diff([frame.timestamp for frame in frames]) * unit
+                return float(np.median(steps[steps > 0]))
+            # the read only returns after one empty read, i.e. one read timeout after the last frame
+            read_timeout = getattr(self.device, "timeout", None) or 0
+            return max(elapsed - read_timeout, 0) / len(frames)
+
+        # calibrated (precision, point delay, time per point, max. relative noise) of every band
+        candidates = []
+        for band, target in bands:
+            measured = []
+            for precision, point_delay in itertools.product(sorted(precisions), sorted(point_delays)):
+                calib_block = replace(
+                    band, steps=calib_steps, precision=precision, point_delay=point_delay
+                )
+                calib_setup = EisMeasurementSetup(
+                    freq_list=calib_block,
+                    repeat=calib_repeat,
+                    time_stamp_ms=int(self.time_stamp_len > 0),
+                    current_range=int(self.current_range_enabled),
+                )
+                self.SetSetup(calib_setup)
+                start = time.perf_counter()
+                frames = self.StartMeasure(calib_setup)
+                elapsed = time.perf_counter() - start
+                if len(frames) == 0:
+                    continue
+                noise = float(np.max(relative_noise(frames)))
+                measured.append((precision, point_delay, time_per_point(frames, elapsed), noise))
+                if noise <= target:
+                    break
+            else:
+                print(
+                    f"Target noise {target} not reached for {band.start_freq}-{band.stop_freq}Hz."
+                    "\n\tUse the highest precision and point delay."
+                )
+            if len(measured) == 0:
+                raise RuntimeError(
+                    f"No calibration data received for {band.start_freq}-{band.stop_freq}Hz."
+                )
+            candidates.append(measured)
+
+        def block_time(k: int) -> float:
+            return int(bands[k][0].steps) * candidates[k][choice[k]][2]
+
+        # start with the cheapest setting meeting the target, i.e. the last calibrated one
+        choice = [len(measured) - 1 for measured in candidates]
+        total_time = sum(block_time(k) for k in range(len(bands)))
+        while total_time > time_budget:
+            # lower the setting of the most expensive block that has a faster calibrated setting
+            faster = {}
+            for k, measured in enumerate(candidates):
+                idx = [i for i, cand in enumerate(measured) if cand[2] < measured[choice[k]][2]]
+                if idx:
+                    faster[k] = idx
+            if not faster:
+                break
+            k = max(faster, key=block_time)
+            choice[k] = min(faster[k], key=lambda i: candidates[k][i][3])
+            total_time = sum(block_time(k) for k in range(len(bands)))
+
+        if total_time > time_budget:
+            print(
+                f"Fastest planned sweep takes about {total_time:.3f}s and exceeds the time budget of {time_budget}s."
+            )
+        planned = []
+        achieved = []
+        for k, (band, _) in enumerate(bands):
+            precision, point_delay, _, noise = candidates[k][choice[k]]
+            planned.append(replace(band, precision=precision, point_delay=point_delay))
+            achieved.append(noise)
+        self.sweep_duration = total_time
+        return planned, achieved
 
-# 0xBD - Set Ethernet Configuration
-# 0xBE - Get Ethernet Configuration
-# 0xCF - TCP connection watchdog
 # 0xD0 - Get ARM firmware ID
 
 
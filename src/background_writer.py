@@ -0,0 +1,104 @@
+""" Background saving of completed measurements during acquisition"""
+
+import queue
+import threading
+import time
+from typing import Callable
+from .catalog import Catalog
+
+
+class BackgroundWriter:
+    """
+    Persists completed measurements on a separate thread.
+    Measurements are handed over through a bounded queue; with the default maxsize of 2 one measurement
+    is written while the next one is filled (double buffering). submit() only blocks if the queue is full,
+    so acquisition runs at the pace of the device as long as storage keeps up on average.
+
+    Parameters
+    ----------
+    save_fn : Callable
+        function persisting a single measurement, e.g. lambda m: np.save(...)
+    maxsize : int, optional
+        number of queued measurements before backpressure is applied, by default 2
+    catalog : Catalog, optional
+        catalog of the written samples, by default None; save_fn must then return
+        the path and the config (ScioSpecMeasurementConfig or dict) of the written sample
+    """
+
+    def __init__(self, save_fn: Callable, maxsize: int = 2, catalog: Catalog = None) -> None:
+        self.save_fn = save_fn
+        self.catalog = catalog
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.n_written = 0
+        self.errors = []
+        self.write_latency_last = 0.0
+        self.write_latency_max = 0.0
+        self.write_latency_sum = 0.0
+        self.backpressure_time = 0.0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is None:
+                self.queue.task_done()
+                break
+            start = time.perf_counter()
+            try:
+                result = self.save_fn(item)
+                if self.catalog is not None:
+                    path, config = result
+                    self.catalog.add(path, config)
+            except Exception as e:
+                self.errors.append(e)
+                print(f"Background writer failed: {e}")
+            latency = time.perf_counter() - start
+            self.write_latency_last = latency
+            self.write_latency_max = max(self.write_latency_max, latency)
+            self.write_latency_sum += latency
+            self.n_written += 1
+            self.queue.task_done()
+
+    def submit(self, measurement) -> None:
+        """
+        Queues a completed measurement. Blocks only while the queue is full.
+        The measurement must not be modified afterwards, pass a copy if its buffer is reused.
+        """
+        if not self.thread.is_alive():
+            raise RuntimeError("Background writer is closed.")
+        start = time.perf_counter()
+        self.queue.put(measurement)
+        self.backpressure_time += time.perf_counter() - start
+
+    @property
+    def queue_depth(self) -> int:
+        return self.queue.qsize()
+
+    def metrics(self) -> dict:
+        """
+        Returns queue depth, write latencies in s and the time submit() was blocked in s.
+        """
+        return {
+            "queue_depth": self.queue_depth,
+            "n_written": self.n_written,
+            "write_latency_last": self.write_latency_last,
+            "write_latency_mean": self.write_latency_sum / max(self.n_written, 1),
+            "write_latency_max": self.write_latency_max,
+            "backpressure_time": self.backpressure_time,
+            "errors": len(self.errors),
+        }
+
+    def close(self) -> None:
+        """
+        Writes all queued measurements and stops the thread.
+        """
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+
+    def __enter__(self) -> "BackgroundWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
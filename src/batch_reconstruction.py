@@ -0,0 +1,158 @@
+""" Offline batch reconstruction of recorded potential matrices"""
+
+import os
+import time
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Tuple, Union
+
+from .dataset_store import DatasetStore
+from .reconstruction import LinearReconstructor, create_protocol, pot_mat_to_meas
+
+
+def open_source(path: str) -> Tuple[Union[DatasetStore, np.ndarray], int]:
+    """
+    Opens potential matrices for block reads without loading them.
+
+    Parameters
+    ----------
+    path : str
+        DatasetStore directory or .npy file of shape (n, n_inj, n_el)
+
+    Returns
+    -------
+    Tuple[Union[DatasetStore, np.ndarray], int]
+        store or memmap and number of potential matrices
+    """
+    if os.path.isdir(path):
+        store = DatasetStore(path)
+        return store, len(store)
+    pot_mats = np.load(path, mmap_mode="r")
+    return pot_mats, len(pot_mats)
+
+
+def read_block(source: Union[DatasetStore, np.ndarray], start: int, stop: int) -> np.ndarray:
+    if isinstance(source, DatasetStore):
+        return source.block(start, stop)
+    return np.asarray(source[start:stop])
+
+
+def reconstruct_chunk(
+    source_path: str,
+    out_path: str,
+    R_path: str,
+    v0: np.ndarray,
+    scale: np.ndarray,
+    n_el: int,
+    inj_skip: Union[int, list],
+    start: int,
+    stop: int,
+    block_size: int,
+) -> int:
+    """
+    Reconstructs the potential matrices start to stop into the output memmap, block by block.
+    The next block is read on a second thread while the current one is computed and written.
+
+    Returns
+    -------
+    int
+        number of reconstructed frames
+    """
+    source, _ = open_source(source_path)
+    out = np.load(out_path, mmap_mode="r+")
+    R = np.load(R_path, mmap_mode="r")
+    protocol_obj = create_protocol(n_el, inj_skip)
+    blocks = [(b, min(b + block_size, stop)) for b in range(start, stop, block_size)]
+
+    with ThreadPoolExecutor(max_workers=1) as reader:
+        pending = reader.submit(read_block, source, *blocks[0])
+        for k, (b_start, b_stop) in enumerate(blocks):
+            pot_mats = pending.result()
+            if k + 1 < len(blocks):
+                pending = reader.submit(read_block, source, *blocks[k + 1])
+            dv = pot_mat_to_meas(pot_mats, protocol_obj) - v0
+            if scale is not None:
+                dv *= scale
+            out[b_start:b_stop] = dv @ R
+    out.flush()
+    return stop - start
+
+
+def batch_reconstruct(
+    source_path: str,
+    out_path: str,
+    reconstructor: LinearReconstructor,
+    ref_pot_mat: np.ndarray,
+    normalize: bool = False,
+    dtype: Union[str, np.dtype] = "complex64",
+    block_size: int = 4096,
+    chunk_size: int = 65536,
+    n_workers: int = None,
+) -> np.ndarray:
+    """
+    Reconstructs all potential matrices of a dataset into a memory-mapped .npy file of images.
+    The dataset is split into chunks that are processed by a pool of processes; every chunk is
+    streamed in blocks of block_size frames and each block is one matrix product with the cached
+    reconstruction matrix. Reading the next block overlaps with computing and writing the current one.
+
+    Parameters
+    ----------
+    source_path : str
+        DatasetStore directory or .npy file of potential matrices of shape (n, n_inj, n_el)
+    out_path : str
+        .npy file of the images of shape (n, n_elems)
+    reconstructor : LinearReconstructor
+        reconstructor with the precomputed matrix
+    ref_pot_mat : np.ndarray
+        reference potential matrix of shape (n_inj, n_el)
+    normalize : bool, optional
+        normalize the difference by |v0| of the reference, by default False
+    dtype : Union[str, np.dtype], optional
+        dtype of the images, by default "complex64"
+    block_size : int, optional
+        frames per matrix product, by default 4096
+    chunk_size : int, optional
+        frames per process task, by default 65536
+    n_workers : int, optional
+        number of processes, 1 runs in this process, by default os.cpu_count()
+
+    Returns
+    -------
+    np.ndarray
+        images as read only memmap
+    """
+    _, n = open_source(source_path)
+    v0 = pot_mat_to_meas(ref_pot_mat, reconstructor.protocol)
+    scale = 1 / np.abs(v0) if normalize else None
+
+    out = np.lib.format.open_memmap(
+        out_path, mode="w+", dtype=dtype, shape=(n, reconstructor.R.shape[1])
+    )
+    del out
+    # the workers share the reconstruction matrix through the page cache
+    R_path = f"{out_path}.R.npy"
+    np.save(R_path, reconstructor.R)
+
+    start = time.perf_counter()
+    chunks = [(c, min(c + chunk_size, n)) for c in range(0, n, chunk_size)]
+    args = (source_path, out_path, R_path, v0, scale, reconstructor.n_el, reconstructor.inj_skip)
+    n_frames = 0
+    try:
+        if n_workers == 1:
+            for c_start, c_stop in chunks:
+                n_frames += reconstruct_chunk(*args, c_start, c_stop, block_size)
+        else:
+            with ProcessPoolExecutor(max_workers=n_workers) as pool:
+                futures = [
+                    pool.submit(reconstruct_chunk, *args, c_start, c_stop, block_size)
+                    for c_start, c_stop in chunks
+                ]
+                for future in as_completed(futures):
+                    n_frames += future.result()
+    finally:
+        os.remove(R_path)
+
+    seconds = max(time.perf_counter() - start, 1e-9)
+    print(f"reconstructed: {n_frames} frames | {n_frames / seconds:.1f} frames/s")
+    print("\t Saved in", out_path)
+    return np.load(out_path, mmap_mode="r")
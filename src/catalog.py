@@ -0,0 +1,219 @@
+""" SQLite metadata catalog over recorded samples"""
+
+import os
+import sqlite3
+import threading
+import numpy as np
+from typing import Union
+from .sciopy_dataclasses import ScioSpecMeasurementConfig
+
+
+catalog_columns = {
+    "n_el": "INTEGER",
+    "burst_count": "INTEGER",
+    "actual_sample": "INTEGER",
+    "object": "TEXT",
+    "size": "REAL",
+    "material": "TEXT",
+    "saline_conductivity": "REAL",
+    "saline_conductivity_unit": "TEXT",
+    "temperature": "REAL",
+    "water_lvl": "REAL",
+    "exc_freq": "REAL",
+    "datetime": "TEXT",
+}
+
+indexed_columns = ["object", "size", "material", "exc_freq", "temperature", "water_lvl", "datetime"]
+
+
+def config_to_row(config: Union[ScioSpecMeasurementConfig, dict]) -> dict:
+    """
+    Extracts the catalog columns of a measurement config.
+
+    Parameters
+    ----------
+    config : Union[ScioSpecMeasurementConfig, dict]
+        measurement config as dataclass or dictionary
+
+    Returns
+    -------
+    dict
+        column values
+    """
+    if not isinstance(config, dict):
+        config = config.__dict__
+    row = {key: config.get(key) for key in catalog_columns}
+    for key, value in row.items():
+        # numpy scalars, e.g. from DatasetStore headers, are not supported by sqlite3
+        if isinstance(value, np.generic):
+            row[key] = value.item()
+    conductivity = config.get("saline_conductivity")
+    if isinstance(conductivity, (tuple, list)):
+        row["saline_conductivity"] = conductivity[0]
+        row["saline_conductivity_unit"] = conductivity[1] if len(conductivity) > 1 else None
+    return row
+
+
+def doteit_header_to_config(header: dict) -> dict:
+    """
+    Maps the header of a .eit file (see doteit.header_keys) onto catalog columns.
+
+    Parameters
+    ----------
+    header : dict
+        .eit header fields
+
+    Returns
+    -------
+    dict
+        config with the catalog column names
+    """
+    config = {"datetime": header.get("date_time")}
+    try:
+        config["exc_freq"] = float(header.get("f_min"))
+        config["n_el"] = int(float(header.get("MeasurementChannels")))
+    except (TypeError, ValueError):
+        pass
+    return config
+
+
+class Catalog:
+    """
+    Local SQLite catalog of recorded samples.
+    Every sample is stored with its file path, an optional offset (e.g. index in a DatasetStore)
+    and the fields of its ScioSpecMeasurementConfig in indexed columns.
+    The writers of the package (DatasetStore, BackgroundWriter, atomic_save_frame,
+    convert_fulldir_doteit and generate_synthetic_dataset) take an optional catalog and add every
+    written sample; backfill() catalogs samples written before. add() may be called from
+    background threads.
+
+    Parameters
+    ----------
+    db_path : str
+        path to the SQLite database, created if it does not exist
+    """
+
+    def __init__(self, db_path: str) -> None:
+        self.db_path = db_path
+        self.con = sqlite3.connect(db_path, check_same_thread=False)
+        self.lock = threading.Lock()
+        columns = ", ".join(f"{key} {sql_type}" for key, sql_type in catalog_columns.items())
+        self.con.execute(
+            "CREATE TABLE IF NOT EXISTS samples ("
+            "path TEXT NOT NULL, offset INTEGER NOT NULL DEFAULT -1, mtime REAL, "
+            f"{columns}, PRIMARY KEY (path, offset))"
+        )
+        for key in indexed_columns:
+            self.con.execute(f"CREATE INDEX IF NOT EXISTS idx_{key} ON samples ({key})")
+        self.con.commit()
+
+    def add(
+        self,
+        path: str,
+        config: Union[ScioSpecMeasurementConfig, dict],
+        offset: int = -1,
+        commit: bool = True,
+    ) -> None:
+        """
+        Adds or updates a sample, call this whenever a sample is written.
+
+        Parameters
+        ----------
+        path : str
+            file of the sample
+        config : Union[ScioSpecMeasurementConfig, dict]
+            measurement config of the sample
+        offset : int, optional
+            position of the sample inside the file, by default -1 (one sample per file)
+        commit : bool, optional
+            commit the transaction, by default True
+        """
+        row = config_to_row(config)
+        row["path"] = os.path.abspath(path)
+        row["offset"] = offset
+        row["mtime"] = os.path.getmtime(path) if os.path.exists(path) else None
+        keys = ", ".join(row)
+        values = ", ".join(f":{key}" for key in row)
+        with self.lock:
+            self.con.execute(f"INSERT OR REPLACE INTO samples ({keys}) VALUES ({values})", row)
+            if commit:
+                self.con.commit()
+
+    def commit(self) -> None:
+        with self.lock:
+            self.con.commit()
+
+    def backfill(self, path: str, config_key: str = "config") -> int:
+        """
+        Scans a directory recursively for .npz samples and catalogs the new or modified ones.
+        The config is stored pickled inside the .npz, so only scan trusted directories.
+
+        Parameters
+        ----------
+        path : str
+            directory of the samples
+        config_key : str, optional
+            key of the config inside the .npz, by default "config"
+
+        Returns
+        -------
+        int
+            number of cataloged samples
+        """
+        with self.lock:
+            known = dict(self.con.execute("SELECT path, mtime FROM samples WHERE offset = -1"))
+        count = 0
+        for root, _, files in os.walk(path):
+            for obj in sorted(files):
+                if not obj.endswith(".npz"):
+                    continue
+                fname = os.path.abspath(os.path.join(root, obj))
+                if known.get(fname) == os.path.getmtime(fname):
+                    continue
+                try:
+                    with np.load(fname, allow_pickle=True) as sample:
+                        if config_key not in sample.files:
+                            continue
+                        config = sample[config_key].tolist()
+                except Exception as e:
+                    print(f"Can not read {fname}: {e}")
+                    continue
+                self.add(fname, config, commit=False)
+                count += 1
+        self.commit()
+        return count
+
+    def query(self, **conditions) -> list:
+        """
+        Returns (path, offset) of all samples matching the conditions.
+        A condition is either a value (equality) or a (min, max) tuple (inclusive range).
+
+        Example
+        -------
+        catalog.query(object="circle", size=20, exc_freq=(9_000, 11_000))
+
+        Returns
+        -------
+        list
+            list of (path, offset) tuples
+        """
+        clauses = []
+        params = []
+        for key, value in conditions.items():
+            if key not in catalog_columns:
+                raise KeyError(f"Unknown catalog column: {key}")
+            if isinstance(value, tuple):
+                clauses.append(f"{key} BETWEEN ? AND ?")
+                params.extend(value)
+            else:
+                clauses.append(f"{key} = ?")
+                params.append(value)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self.lock:
+            return self.con.execute(
+                f"SELECT path, offset FROM samples{where} ORDER BY path, offset", params
+            ).fetchall()
+
+    def close(self) -> None:
+        with self.lock:
+            self.con.close()
@@ -5,9 +5,10 @@ try:
 except ImportError:
     print("Could not import module: serial")
 
-from sciopy_dataclasses import EitMeasurementSetup, SingleFrame
+from sciopy_dataclasses import EitMeasurementSetup, EisFrame, FreqList, SingleFrame
 
 import numpy as np
+import socket
 import struct
 import sys
 from glob import glob
@@ -49,6 +50,56 @@ def available_serial_ports() -> list:
             pass
     return result
 
+class TcpDevice:
+    """
+    Socket-based transport with the read/write interface of serial.Serial,
+    used to talk to the ISX-3 via its Ethernet interface.
+
+    Parameters
+    ----------
+    host : str
+        IP address or host name of the device
+    port : int
+        TCP port of the device
+    timeout : float, optional
+        read timeout in s, by default 1
+    """
+
+    def __init__(self, host: str, port: int, timeout: float = 1) -> None:
+        self.name = f"{host}:{port}"
+        self.timeout = timeout
+        self.sock = socket.create_connection((host, port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.buffer = bytearray()
+
+    def write(self, data: bytes) -> int:
+        self.sock.sendall(data)
+        return len(data)
+
+    @property
+    def in_waiting(self) -> int:
+        """
+        Number of received bytes that can be read without waiting, as serial.Serial.in_waiting.
+        """
+        return len(self.buffer)
+
+    def read(self, size: int = 1) -> bytes:
+        """
+        Reads up to size bytes. Returns b'' if nothing arrived within the timeout.
+        """
+        if not self.buffer:
+            try:
+                self.buffer.extend(self.sock.recv(4096))
+            except socket.timeout:
+                return b""
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+    def close(self) -> None:
+        self.sock.close()
+
+
 def uintTbt(val: int):
     """
     uintTbt converts a positive integer to a list of bytes (4Bytes).
@@ -57,6 +108,26 @@ def uintTbt(val: int):
     return struct.pack(">I", val)
 
 
+def format_sync_time_to_hex(sync_time: Union[int, float]) -> list:
+    """
+    format_sync_time_to_hex converts a sync time in s to the 4Byte unsigned integer in us of the ISX-3.
+
+    Parameters
+    ----------
+    sync_time : Union[int, float]
+        sync time in s, 0s <= sync_time <= 180s
+
+    Returns
+    -------
+    list
+        list of 4 bytes
+    """
+    sync_time_us = int(round(sync_time * 1e6))
+    if not 0 <= sync_time_us <= 180_000_000:
+        raise ValueError(f"Sync time {sync_time}s is out of the available range 0s-180s.")
+    return list(uintTbt(sync_time_us))
+
+
 def clTbt_sp(val: Union[int, float]) -> list:
     """
     clTbt_sp converts a signed integer or float value to a list of single precision bytes (4Bytes).
@@ -276,3 +347,83 @@ def split_bursts_in_frames(
         burst_frame.append(frame)
         frame = []  # Reset channel depending single burst frame
     return np.array(burst_frame)
+
+
+def freq_list_points(freq_list: FreqList) -> np.ndarray:
+    """
+    Computes the frequency points of a FreqList block as the ISX-3 distributes them.
+
+    Parameters
+    ----------
+    freq_list : FreqList
+        frequency block (scale: linear 0, logarithmic 1)
+
+    Returns
+    -------
+    np.ndarray
+        frequency points in Hz
+    """
+    steps = int(freq_list.steps)
+    if freq_list.scale == 1:
+        return np.geomspace(freq_list.start_freq, freq_list.stop_freq, steps)
+    return np.linspace(freq_list.start_freq, freq_list.stop_freq, steps)
+
+
+def parse_eis_frames(
+    received_hex: list, time_stamp_len: int = 0, current_range: bool = False
+) -> list:
+    """
+    Parse the measurement data frames (0xB8) of an ISX-3 spectrum.
+    Acknowledge and system messages inside the buffer are skipped.
+
+    Frame layout
+        [CT] [LE] [ID] [Time stamp] [Current Range] [Real part] [Imaginary part] [CT]
+
+    Parameters
+    ----------
+    received_hex : list
+        message buffer in hexadecimal representation
+    time_stamp_len : int, optional
+        length of the time stamp in bytes: disabled 0, ms 4, us 5, by default 0
+    current_range : bool, optional
+        current range output enabled, by default False
+
+    Returns
+    -------
+    list
+        list of EisFrame
+    """
+    received = [int(ele, 16) for ele in received_hex]
+    frame_len = 2 + time_stamp_len + int(current_range) + 8
+    frames = []
+    i = 0
+    while i + frame_len + 2 < len(received):
+        if not (
+            received[i] == 0xB8
+            and received[i + 1] == frame_len
+            and received[i + frame_len + 2] == 0xB8
+        ):
+            i += 1
+            continue
+        pos = i + 2
+        point_id = int.from_bytes(bytes(received[pos : pos + 2]), "big")
+        pos += 2
+        timestamp = None
+        if time_stamp_len:
+            timestamp = int.from_bytes(bytes(received[pos : pos + time_stamp_len]), "big")
+            pos += time_stamp_len
+        c_range = None
+        if current_range:
+            c_range = received[pos]
+            pos += 1
+        real, imag = struct.unpack(">ff", bytes(received[pos : pos + 8]))
+        frames.append(
+            EisFrame(
+                id=point_id,
+                timestamp=timestamp,
+                current_range=c_range,
+                impedance=complex(real, imag),
+            )
+        )
+        i += frame_len + 3
+    return frames
@@ -0,0 +1,266 @@
+""" Consolidated memory-mapped store for many converted recordings"""
+
+import os
+import json
+import numpy as np
+from typing import Tuple, Union
+from .catalog import Catalog
+
+
+class DatasetStore:
+    """
+    Packs many samples (potential matrices or frame arrays) of one fixed shape and dtype
+    into a few large .npy shards, plus a compact index of header fields.
+
+    Layout of the store directory
+        meta.json           sample shape, dtype, header dtype and shard size
+        data_00000.npy ...  shards of shape (shard_size, *sample_shape), opened as memmap
+        index.bin           one fixed-size header record per sample, appended in place
+
+    The index is written after the data, so the number of records is the number of complete samples.
+    Random access to sample i is a single memmap lookup and appending never rewrites existing data.
+
+    Parameters
+    ----------
+    path : str
+        directory of the store
+    mode : str, optional
+        "r" read only, "r+" read and append, by default "r"
+    catalog : Catalog, optional
+        catalog that gets every appended sample with its index as offset, by default None
+    """
+
+    def __init__(self, path: str, mode: str = "r", catalog: Catalog = None) -> None:
+        self.path = path
+        self.mode = mode
+        self.catalog = catalog
+        with open(os.path.join(path, "meta.json"), "r") as f:
+            meta = json.load(f)
+        self.sample_shape = tuple(meta["sample_shape"])
+        self.dtype = np.dtype(meta["dtype"])
+        self.header_dtype = np.dtype([tuple(field) for field in meta["header_dtype"]])
+        self.shard_size = meta["shard_size"]
+        self._shards = {}
+        self._index = None
+
+    @classmethod
+    def create(
+        cls,
+        path: str,
+        sample_shape: tuple,
+        dtype: Union[str, np.dtype] = "complex128",
+        header_dtype: list = None,
+        shard_size: int = 4096,
+        catalog: Catalog = None,
+    ) -> "DatasetStore":
+        """
+        Creates an empty store.
+
+        Parameters
+        ----------
+        path : str
+            directory of the store
+        sample_shape : tuple
+            shape of a single sample, e.g. (n_el, n_el) for a potential matrix
+        dtype : Union[str, np.dtype], optional
+            dtype of the samples, by default "complex128"
+        header_dtype : list, optional
+            header fields as numpy dtype list, e.g. [("setup_name", "U64"), ("exc_freq", "f8")],
+            by default [("sample", "i8")]
+        shard_size : int, optional
+            samples per shard, by default 4096
+        catalog : Catalog, optional
+            catalog of the appended samples, by default None
+
+        Returns
+        -------
+        DatasetStore
+            store opened in "r+" mode
+        """
+        if header_dtype is None:
+            header_dtype = [("sample", "i8")]
+        os.makedirs(path, exist_ok=True)
+        if os.path.exists(os.path.join(path, "meta.json")):
+            raise FileExistsError(f"There is already a dataset store in {path}.")
+        meta = {
+            "sample_shape": list(sample_shape),
+            "dtype": np.dtype(dtype).str,
+            "header_dtype": np.dtype(header_dtype).descr,
+            "shard_size": shard_size,
+        }
+        with open(os.path.join(path, "meta.json"), "w") as f:
+            json.dump(meta, f)
+        open(os.path.join(path, "index.bin"), "wb").close()
+        return cls(path, mode="r+", catalog=catalog)
+
+    def __len__(self) -> int:
+        return os.path.getsize(os.path.join(self.path, "index.bin")) // self.header_dtype.itemsize
+
+    def __getitem__(self, i: int) -> Tuple[np.ndarray, np.void]:
+        return self.sample(i), self.header[i]
+
+    @property
+    def header(self) -> np.ndarray:
+        """
+        Header records of all samples as read only structured memmap.
+        """
+        n = len(self)
+        if self._index is None or len(self._index) != n:
+            if n == 0:
+                return np.empty(0, dtype=self.header_dtype)
+            self._index = np.memmap(
+                os.path.join(self.path, "index.bin"), dtype=self.header_dtype, mode="r", shape=(n,)
+            )
+        return self._index
+
+    def _shard(self, k: int, create: bool = False) -> np.ndarray:
+        fname = os.path.join(self.path, f"data_{k:05d}.npy")
+        if k not in self._shards:
+            if create and not os.path.exists(fname):
+                self._shards[k] = np.lib.format.open_memmap(
+                    fname, mode="w+", dtype=self.dtype, shape=(self.shard_size, *self.sample_shape)
+                )
+            else:
+                self._shards[k] = np.load(fname, mmap_mode=self.mode)
+        return self._shards[k]
+
+    def sample(self, i: int) -> np.ndarray:
+        """
+        Returns sample i without loading any other sample.
+        """
+        n = len(self)
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError(f"Sample {i} is out of range for a store with {n} samples.")
+        return self._shard(i // self.shard_size)[i % self.shard_size]
+
+    def block(self, start: int, stop: int) -> np.ndarray:
+        """
+        Returns the samples start to stop as one array, read shard by shard.
+        """
+        stop = min(stop, len(self))
+        out = np.empty((max(stop - start, 0), *self.sample_shape), dtype=self.dtype)
+        pos = start
+        while pos < stop:
+            k, row = divmod(pos, self.shard_size)
+            n = min(self.shard_size - row, stop - pos)
+            out[pos - start : pos - start + n] = self._shard(k)[row : row + n]
+            pos += n
+        return out
+
+    def append(self, sample: np.ndarray, header: dict = None, config: dict = None) -> int:
+        """
+        Appends one sample.
+
+        Parameters
+        ----------
+        sample : np.ndarray
+            sample of shape sample_shape
+        header : dict, optional
+            header fields of the sample, missing fields are zero
+        config : dict, optional
+            catalog entry of the sample, by default the header
+
+        Returns
+        -------
+        int
+            index of the appended sample
+        """
+        configs = None if config is None else [config]
+        return self.extend(np.asarray(sample)[np.newaxis], [header or {}], configs)[0]
+
+    def extend(self, samples: np.ndarray, headers: list = None, configs: list = None) -> range:
+        """
+        Appends a batch of samples.
+        If the store has a catalog, every sample is cataloged with its index as offset.
+
+        Parameters
+        ----------
+        samples : np.ndarray
+            samples of shape (n, *sample_shape)
+        headers : list, optional
+            list of header dicts, one per sample
+        configs : list, optional
+            catalog entries (ScioSpecMeasurementConfig or dict), one per sample,
+            by default the headers
+
+        Returns
+        -------
+        range
+            indices of the appended samples
+        """
+        if self.mode == "r":
+            raise PermissionError("The dataset store is opened read only.")
+        samples = np.asarray(samples)
+        if samples.shape[1:] != self.sample_shape:
+            raise ValueError(f"Sample shape {samples.shape[1:]} does not match {self.sample_shape}.")
+        if headers is None:
+            headers = [{}] * len(samples)
+        if len(headers) != len(samples):
+            raise ValueError("Number of headers and samples differ.")
+
+        start = len(self)
+        pos = 0
+        while pos < len(samples):
+            i = start + pos
+            k, row = divmod(i, self.shard_size)
+            n = min(self.shard_size - row, len(samples) - pos)
+            shard = self._shard(k, create=True)
+            shard[row : row + n] = samples[pos : pos + n]
+            shard.flush()
+            pos += n
+
+        records = np.zeros(len(samples), dtype=self.header_dtype)
+        for record, header in zip(records, headers):
+            for key, value in header.items():
+                if key in self.header_dtype.names:
+                    record[key] = value
+        with open(os.path.join(self.path, "index.bin"), "ab") as f:
+            f.write(records.tobytes())
+
+        if self.catalog is not None:
+            for i, config in enumerate(configs if configs is not None else headers):
+                self.catalog.add(self.path, config, offset=start + i, commit=False)
+            self.catalog.commit()
+        return range(start, start + len(samples))
+
+
+def pack_npz_to_store(
+    files: list, store: DatasetStore, data_key: str = "potential_matrix", batch_size: int = None
+) -> range:
+    """
+    Packs single .npz samples into a dataset store.
+    Header fields of the store are taken from equally named keys of the .npz files.
+    The files are loaded and appended in batches of batch_size samples, so memory stays bounded.
+
+    Parameters
+    ----------
+    files : list
+        list of .npz files
+    store : DatasetStore
+        store opened in "r+" mode
+    data_key : str, optional
+        key of the sample array, by default "potential_matrix"
+    batch_size : int, optional
+        samples per append, by default the shard size of the store
+
+    Returns
+    -------
+    range
+        indices of the packed samples
+    """
+    batch_size = batch_size or store.shard_size
+    start = len(store)
+    for b in range(0, len(files), batch_size):
+        batch = files[b : b + batch_size]
+        samples = np.empty((len(batch), *store.sample_shape), dtype=store.dtype)
+        headers = []
+        for i, fname in enumerate(batch):
+            with np.load(fname, allow_pickle=False) as npz:
+                samples[i] = npz[data_key]
+                headers.append(
+                    {key: npz[key][()] for key in store.header_dtype.names if key in npz.files}
+                )
+        store.extend(samples, headers)
+    return range(start, len(store))
@@ -1,9 +1,16 @@
 """ Convert a .eit file to python sctructured data"""
 
 import os
+import hashlib
+import json
+import time
 import numpy as np
 import pickle
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime as dt
+from typing import Tuple
 from .sciopy_dataclasses import SingleEitFrame
+from .catalog import Catalog, doteit_header_to_config
 
 
 header_keys = [
@@ -28,6 +35,66 @@ header_keys = [
 ]
 
 
+def check_token_counts(n_tokens: np.ndarray) -> None:
+    """
+    Raises a ValueError unless all data blocks have the same even number of values (float pairs).
+    """
+    if np.any(n_tokens != n_tokens[0]) or n_tokens[0] % 2 != 0:
+        raise ValueError("Data blocks of the electrode combinations differ in length.")
+
+
+def data_lines_to_array(data_lines: list) -> np.ndarray:
+    """
+    Converts tab separated data lines of a .eit file into a complex array of shape (lines, values).
+    The token count of every line is checked, a reshape of the joined values would hide ragged blocks.
+    """
+    n_tokens = np.char.count(np.char.strip(np.array(data_lines, dtype=str)), "\t") + 1
+    check_token_counts(n_tokens)
+    values = np.fromstring("\t".join(data_lines), sep="\t")
+    if values.size != n_tokens.sum():
+        raise ValueError("Data blocks contain values that are not numbers.")
+    return values.reshape(len(data_lines), -1).view(complex)
+
+
+def doteit_in_array(
+    read_content: list, split_freqs: bool = True
+) -> Tuple[dict, list, np.ndarray]:
+    """
+    Parses the content of a .eit file into one complex array.
+    All data blocks are converted in bulk and the float pairs are viewed as complex values.
+
+    Parameters
+    ----------
+    read_content : list
+        lines of the .eit file
+    split_freqs : bool, optional
+        split the values of each electrode combination into (channels, freqs) if f_count > 1,
+        assuming the channels of one frequency are stored consecutively, by default True
+
+    Returns
+    -------
+    Tuple[dict, list, np.ndarray]
+        header, electrode combination index (e.g. "1_2") and data of shape (injections, channels[, freqs])
+    """
+    header = dict(zip(header_keys, read_content))
+    header["f_scale"] = "linear" if header["f_scale"] == 0 else "logarithmic"
+
+    n_head = len(header_keys)
+    el_cmbs = [
+        "_".join(line.split(" ")[:2]) for line in read_content[n_head : len(read_content) - 1 : 2]
+    ]
+    data_lines = read_content[n_head + 1 :: 2][: len(el_cmbs)]
+    if len(el_cmbs) == 0:
+        return header, el_cmbs, np.empty((0, 0), dtype=complex)
+
+    data = data_lines_to_array(data_lines)
+
+    f_count = int(float(header.get("f_count", 1) or 1))
+    if split_freqs and f_count > 1 and data.shape[1] % f_count == 0:
+        data = data.reshape(len(el_cmbs), f_count, -1).transpose(0, 2, 1)
+    return header, el_cmbs, data
+
+
 def doteit_in_SingleEitFrame(read_content: list) -> SingleEitFrame:
     """
     Returns single object without saving anything.
@@ -35,7 +102,7 @@ def doteit_in_SingleEitFrame(read_content: list) -> SingleEitFrame:
     Parameters
     ----------
     read_content : list
-        the 1st param name `first`
+        lines of the .eit file
 
     Returns
     -------
@@ -43,25 +110,242 @@ def doteit_in_SingleEitFrame(read_content: list) -> SingleEitFrame:
         class object
     """
     frame = SingleEitFrame()
+    header, el_cmbs, data = doteit_in_array(read_content, split_freqs=False)
 
-    for content, key in zip(read_content, header_keys):
+    for key, content in header.items():
         # Inserting header part
         setattr(frame, key, content)
-    frame.f_scale = "linear" if frame.f_scale == 0 else "logarithmic"
-
-    for i in range(len(header_keys), len(read_content) - 1, 2):
-        el_cmb = read_content[i].split(" ")
-        el_cmb = f"{el_cmb[0]}_{el_cmb[1]}"
-        lct = read_content[i + 1].split("\t")
-        lct = [ele.replace("E", "e") for ele in lct]
-        lct = [float(ele) for ele in lct]
-        fin_val = np.zeros(len(lct) // 2, dtype=complex)
-        for idx, cmpl in enumerate(range(0, len(lct), 2)):
-            fin_val[idx] = complex(lct[cmpl], lct[cmpl + 1])
-        setattr(frame, el_cmb, np.array(fin_val))
+    for el_cmb, fin_val in zip(el_cmbs, data):
+        setattr(frame, el_cmb, fin_val.copy())
     return frame
 
 
+def read_doteit_header(fname: str) -> dict:
+    """
+    Reads only the header block of a .eit file.
+
+    Parameters
+    ----------
+    fname : str
+        name of the file
+
+    Returns
+    -------
+    dict
+        header fields named by header_keys
+    """
+    header = {}
+    with open(fname, "r", errors="replace") as file:
+        for key in header_keys:
+            header[key] = file.readline().rstrip("\n")
+    header["f_scale"] = "linear" if header["f_scale"] == 0 else "logarithmic"
+    return header
+
+
+class LazyDotEit:
+    """
+    Lazy reader of a .eit file.
+    Only the header is parsed on creation. The byte offsets of the electrode combination
+    blocks are indexed on first access and every block is decoded when it is first requested.
+
+    Parameters
+    ----------
+    fname : str
+        name of the file
+    """
+
+    def __init__(self, fname: str) -> None:
+        self.fname = fname
+        self.header = read_doteit_header(fname)
+        self._offsets = None
+        self._blocks = {}
+
+    def __getattr__(self, name: str):
+        # Header fields are accessible like SingleEitFrame attributes
+        if name in header_keys:
+            return self.header[name]
+        raise AttributeError(name)
+
+    def _index_blocks(self) -> dict:
+        offsets = {}
+        n_tokens = []
+        with open(self.fname, "rb") as file:
+            for _ in header_keys:
+                file.readline()
+            while True:
+                cmb_line = file.readline()
+                offset = file.tell()
+                data_line = file.readline()
+                if not data_line:
+                    break
+                el_cmb = "_".join(cmb_line.decode().rstrip("\r\n").split(" ")[:2])
+                offsets[el_cmb] = offset
+                n_tokens.append(data_line.strip().count(b"\t") + 1)
+        # the same files as doteit_in_array are accepted
+        if n_tokens:
+            check_token_counts(np.array(n_tokens))
+        return offsets
+
+    @property
+    def el_cmbs(self) -> list:
+        """
+        Electrode combinations of the file, e.g. "1_2".
+        """
+        if self._offsets is None:
+            self._offsets = self._index_blocks()
+        return list(self._offsets)
+
+    def __getitem__(self, el_cmb: str) -> np.ndarray:
+        if el_cmb not in self._blocks:
+            if self._offsets is None:
+                self._offsets = self._index_blocks()
+            with open(self.fname, "rb") as file:
+                file.seek(self._offsets[el_cmb])
+                line = file.readline().decode()
+            self._blocks[el_cmb] = data_lines_to_array([line])[0]
+        return self._blocks[el_cmb]
+
+    def to_SingleEitFrame(self) -> SingleEitFrame:
+        """
+        Decodes all blocks into a SingleEitFrame.
+        """
+        frame = SingleEitFrame()
+        for key, content in self.header.items():
+            setattr(frame, key, content)
+        for el_cmb in self.el_cmbs:
+            setattr(frame, el_cmb, self[el_cmb])
+        return frame
+
+
+class DotEitWriter:
+    """
+    Streaming writer of the .eit file format read by doteit_in_SingleEitFrame.
+    The header is written on creation and every electrode combination block is appended as soon as
+    it is available. Writes are buffered and the file is written as fname + ".part" and renamed on close,
+    so readers never pick up an incomplete file.
+
+    Parameters
+    ----------
+    fname : str
+        name of the .eit file
+    header : dict
+        header fields named by header_keys, missing fields are written as 0
+    buffer_size : int, optional
+        write buffer in bytes, by default 1 MiB
+    """
+
+    def __init__(self, fname: str, header: dict, buffer_size: int = 1 << 20) -> None:
+        self.fname = fname
+        self.part_name = fname + ".part"
+        self.file = open(self.part_name, "w", buffering=buffer_size)
+        header = dict(header)
+        header.setdefault("number_of_header", len(header_keys))
+        for key in header_keys:
+            self.file.write(f"{header.get(key, 0)}\n")
+
+    def write_block(self, el_1: int, el_2: int, values: np.ndarray) -> None:
+        """
+        Appends the complex values of one electrode combination.
+
+        Parameters
+        ----------
+        el_1 : int
+            first electrode of the combination (e.g. injecting electrode)
+        el_2 : int
+            second electrode of the combination (e.g. ground electrode)
+        values : np.ndarray
+            complex values of the combination
+        """
+        values = np.asarray(values, dtype=complex).ravel()
+        pairs = np.empty(2 * len(values))
+        pairs[0::2] = values.real
+        pairs[1::2] = values.imag
+        self.file.write(f"{el_1} {el_2}\n")
+        self.file.write("\t".join(f"{val:E}" for val in pairs) + "\n")
+
+    def close(self) -> None:
+        self.file.close()
+        os.replace(self.part_name, self.fname)
+
+    def __enter__(self) -> "DotEitWriter":
+        return self
+
+    def __exit__(self, exc_type, *args) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+
+
+class DotEitStreamWriter:
+    """
+    Writes potential matrices as .eit files while they are acquired, one file per burst.
+    It has a submit() method, so it can be passed to EIT_16_32_64_128.run_acquisition directly
+    (alone or next to other consumers); no export pass after the measurement is needed.
+    Each injection row is written as one electrode combination block.
+
+    Parameters
+    ----------
+    s_path : str
+        save path
+    header : dict
+        header fields named by header_keys, setup_name and date_time are set per file
+    injection_pattern : np.ndarray
+        injection and ground electrode of every row, shape (n_inj, 2)
+    setup_name : str, optional
+        prefix of the file names and setup_name header field, by default "eit"
+    """
+
+    def __init__(
+        self, s_path: str, header: dict, injection_pattern: np.ndarray, setup_name: str = "eit"
+    ) -> None:
+        self.s_path = s_path
+        self.header = dict(header)
+        self.injection_pattern = np.asarray(injection_pattern)
+        self.setup_name = setup_name
+        self.n_files = 0
+        self.fnames = []
+        os.makedirs(s_path, exist_ok=True)
+
+    def submit(self, pot_mat: np.ndarray) -> list:
+        """
+        Writes a potential matrix (n_inj, n_el) or a burst of them (burst_count, n_inj, n_el).
+
+        Returns
+        -------
+        list
+            list of written files
+        """
+        pot_mat = np.asarray(pot_mat)
+        bursts = pot_mat[np.newaxis] if pot_mat.ndim == 2 else pot_mat
+        if bursts.shape[1] != len(self.injection_pattern):
+            raise ValueError(
+                f"Potential matrix has {bursts.shape[1]} rows, "
+                f"the injection pattern {len(self.injection_pattern)}."
+            )
+        fnames = []
+        for burst in bursts:
+            name = f"{self.setup_name}_{self.n_files:05d}"
+            fname = os.path.join(self.s_path, f"{name}.eit")
+            header = {**self.header, "setup_name": name, "date_time": dt.now().isoformat()}
+            with DotEitWriter(fname, header) as writer:
+                for (v_el, g_el), row in zip(self.injection_pattern, burst):
+                    writer.write_block(v_el, g_el, row)
+            self.n_files += 1
+            fnames.append(fname)
+        self.fnames.extend(fnames)
+        return fnames
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> "DotEitStreamWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
 def list_eit_files(path: str) -> list:
     """
     Returns a list of all .eit files in the directory path.
@@ -76,12 +360,7 @@ def list_eit_files(path: str) -> list:
     list
         list of files with .eit ending
     """
-    global src_list
-    try:
-        src_list = [_ for _ in os.listdir(path) if _.endswith(".eit")]
-        return src_list
-    except BaseException:
-        print(f"Can not find a .eit file in:\n {path}")
+    return sorted(obj for obj in os.listdir(path) if obj.endswith(".eit"))
 
 
 def list_all_files(path: str) -> None:
@@ -115,7 +394,7 @@ def single_eit_in_pickle(fname: str, s_path: str) -> None:
     -------
     None
     """
-    with open(fname, "r") as file:
+    with open(fname, "r", errors="replace") as file:
         read_content = file.read().split("\n")
 
     frame = doteit_in_SingleEitFrame(read_content)
@@ -142,9 +421,135 @@ def load_pickle_to_dict(path: str) -> dict:
     return tmp
 
 
-def convert_fulldir_doteit_to_pickle(lpath: str, spath: str) -> None:
+def read_setup_name(fname: str) -> str:
+    """
+    Reads only the setup name from the header of a .eit file.
+
+    Parameters
+    ----------
+    fname : str
+        name of the file
+
+    Returns
+    -------
+    str
+        setup name
+    """
+    with open(fname, "r", errors="replace") as file:
+        for _ in range(header_keys.index("setup_name")):
+            file.readline()
+        return file.readline().rstrip("\n")
+
+
+def atomic_write(out_path: str, write) -> None:
+    """
+    Writes to a temporary file and renames it to out_path,
+    so an interrupted conversion never leaves a partial output.
+
+    Parameters
+    ----------
+    out_path : str
+        output file
+    write : callable
+        function writing into the opened binary file object
+    """
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, out_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def split_frame(frame: SingleEitFrame) -> Tuple[dict, list, np.ndarray]:
+    """
+    Splits a frame into its header fields and one array of all electrode combinations.
+
+    Parameters
+    ----------
+    frame : SingleEitFrame
+        converted frame
+
+    Returns
+    -------
+    Tuple[dict, list, np.ndarray]
+        header, electrode combination index and data of shape (injections, values)
+    """
+    header = {key: val for key, val in frame.__dict__.items() if key in header_keys}
+    el_cmbs = [key for key in frame.__dict__ if key not in header_keys]
+    if len(el_cmbs) == 0:
+        return header, el_cmbs, np.empty((0, 0), dtype=complex)
+    return header, el_cmbs, np.stack([frame.__dict__[key] for key in el_cmbs])
+
+
+def atomic_save_frame(
+    frame: SingleEitFrame, out_path: str, fmt: str = "npz", catalog: Catalog = None
+) -> None:
+    """
+    Saves a frame atomically.
+    The "npy" format is pickle-free: the header and the electrode combination index are saved as
+    .json next to out_path and the measurement data as one raw .npy array.
+
+    Parameters
+    ----------
+    frame : SingleEitFrame
+        converted frame
+    out_path : str
+        output file
+    fmt : str, optional
+        "npz", "npy" or "pickle", by default "npz"
+    catalog : Catalog, optional
+        catalog of the saved frames, by default None
+    """
+    if fmt == "npz":
+        atomic_write(out_path, lambda f: np.savez(f, **(frame.__dict__)))
+    elif fmt == "pickle":
+        atomic_write(out_path, lambda f: pickle.dump(frame, f))
+    elif fmt == "npy":
+        header, el_cmbs, data = split_frame(frame)
+        meta = json.dumps({"header": header, "el_cmbs": el_cmbs}).encode()
+        # The .json is written first, the .npy marks a complete output.
+        atomic_write(os.path.splitext(out_path)[0] + ".json", lambda f: f.write(meta))
+        atomic_write(out_path, lambda f: np.save(f, data))
+    else:
+        raise ValueError(f"Unknown format: {fmt}. Use 'npz', 'npy' or 'pickle'.")
+    if catalog is not None:
+        catalog.add(out_path, doteit_header_to_config(frame.__dict__))
+
+
+def load_npy_to_dict(path: str, mmap_mode: str = "r") -> dict:
+    """
+    Load a frame saved in the "npy" format into a python dictionary without unpickling.
+    The dictionary has the same keys as load_pickle_to_dict.
+
+    Parameters
+    ----------
+    path : str
+        path to the .npy or .json file of the frame
+    mmap_mode : str, optional
+        memory-map mode of the measurement data, by default "r"
+
+    Returns
+    -------
+    dict
+        header fields and one array per electrode combination
+    """
+    base = os.path.splitext(path)[0]
+    with open(base + ".json", "r") as f:
+        meta = json.load(f)
+    data = np.load(base + ".npy", mmap_mode=mmap_mode, allow_pickle=False)
+    tmp = dict(meta["header"])
+    for el_cmb, values in zip(meta["el_cmbs"], data):
+        tmp[el_cmb] = values
+    return tmp
+
+
+def migrate_pickle_to_npy(lpath: str, spath: str) -> None:
     """
-    Converts all .eit files in a directory to .pickle files in a directory spath.
+    Converts all existing .pickle frames in lpath to the pickle-free "npy" format in spath.
+    The pickles are loaded once, so only migrate files from a trusted source.
 
     Parameters
     ----------
@@ -157,17 +562,63 @@ def convert_fulldir_doteit_to_pickle(lpath: str, spath: str) -> None:
     -------
     None
     """
-    objects = list_eit_files(lpath)
-    for obj in objects:
-        fname = lpath + obj
-        single_eit_in_pickle(fname, spath)
-        print("converted:", obj)
+    for obj in sorted(os.listdir(lpath)):
+        if not obj.endswith(".pickle"):
+            continue
+        with open(os.path.join(lpath, obj), "rb") as f:
+            frame = pickle.load(f)
+        atomic_save_frame(frame, os.path.join(spath, f"{os.path.splitext(obj)[0]}.npy"), "npy")
+        print("migrated:", obj)
     print("\t Saved in", spath)
 
 
-def convert_fulldir_doteit_to_npz(lpath: str, spath: str) -> None:
+def convert_single_doteit(
+    fname: str, spath: str, fmt: str = "npz", known_hash: str = None
+) -> Tuple[str, str, int]:
+    """
+    Converts a single .eit file, unless its output is newer than the source
+    or the content hash matches the hash of the last conversion.
+
+    Parameters
+    ----------
+    fname : str
+        name of the file
+    spath : str
+        save path
+    fmt : str, optional
+        "npz", "npy" or "pickle", by default "npz"
+    known_hash : str, optional
+        sha256 of the source at the last conversion, by default None
+
+    Returns
+    -------
+    Tuple[str, str, int]
+        status ("converted" or "skipped"), sha256 of the source and number of converted bytes
+    """
+    out_path = os.path.join(spath, f"{read_setup_name(fname)}.{fmt}")
+    if os.path.exists(out_path) and os.path.getmtime(out_path) >= os.path.getmtime(fname):
+        return "skipped", known_hash, 0
+
+    with open(fname, "rb") as file:
+        raw = file.read()
+    content_hash = hashlib.sha256(raw).hexdigest()
+    if content_hash == known_hash and os.path.exists(out_path):
+        return "skipped", content_hash, 0
+
+    # headers may hold non UTF-8 characters (e.g. a latin-1 "µ"), the numeric data is plain ASCII
+    read_content = raw.decode(errors="replace").replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    frame = doteit_in_SingleEitFrame(read_content)
+    atomic_save_frame(frame, out_path, fmt)
+    return "converted", content_hash, len(raw)
+
+
+def convert_fulldir_doteit(
+    lpath: str, spath: str, fmt: str = "npz", n_workers: int = None, catalog: Catalog = None
+) -> dict:
     """
-    Converts all .eit files in a directory to .npz files in a directory spath.
+    Converts all new or changed .eit files in lpath across a process pool.
+    The content hashes of converted files are kept in spath/.doteit_index.json.
+    On platforms using spawn (Windows, macOS) call this under `if __name__ == "__main__":`.
 
     Parameters
     ----------
@@ -175,16 +626,245 @@ def convert_fulldir_doteit_to_npz(lpath: str, spath: str) -> None:
         load path
     spath : str
         save path
+    fmt : str, optional
+        "npz", "npy" or "pickle", by default "npz"
+    n_workers : int, optional
+        number of processes, by default os.cpu_count(); 1 converts in this process
+    catalog : Catalog, optional
+        catalog of the converted files, filled in this process, by default None
 
     Returns
     -------
-    None
+    dict
+        conversion statistics
     """
+    index_path = os.path.join(spath, ".doteit_index.json")
+    index = {}
+    if os.path.exists(index_path):
+        with open(index_path, "r") as f:
+            index = json.load(f)
+
     objects = list_eit_files(lpath)
-    for obj in objects:
-        fname = lpath + obj
-        with open(fname, "r") as file:
-            read_content = file.read().split("\n")
+    stats = {"converted": 0, "skipped": 0, "failed": 0, "bytes": 0}
+    start = time.perf_counter()
+
+    def collect(obj: str, result: Tuple[str, str, int]) -> None:
+        status, content_hash, n_bytes = result
+        stats[status] += 1
+        stats["bytes"] += n_bytes
+        if content_hash is not None:
+            index[obj] = content_hash
+        if catalog is not None and status == "converted":
+            fname = os.path.join(lpath, obj)
+            out_path = os.path.join(spath, f"{read_setup_name(fname)}.{fmt}")
+            catalog.add(out_path, doteit_header_to_config(read_doteit_header(fname)), commit=False)
+
+    if n_workers == 1:
+        for obj in objects:
+            try:
+                collect(obj, convert_single_doteit(os.path.join(lpath, obj), spath, fmt, index.get(obj)))
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"failed: {obj} ({e})")
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = {
+                pool.submit(convert_single_doteit, os.path.join(lpath, obj), spath, fmt, index.get(obj)): obj
+                for obj in objects
+            }
+            for future in as_completed(futures):
+                try:
+                    collect(futures[future], future.result())
+                except Exception as e:
+                    stats["failed"] += 1
+                    print(f"failed: {futures[future]} ({e})")
+
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+    if catalog is not None:
+        catalog.commit()
+
+    stats["seconds"] = max(time.perf_counter() - start, 1e-9)
+    mb = stats["bytes"] / 1e6
+    print(
+        f"converted: {stats['converted']}, skipped: {stats['skipped']}, failed: {stats['failed']}"
+        f" | {stats['converted'] / stats['seconds']:.1f} files/s, {mb / stats['seconds']:.1f} MB/s"
+    )
+    print("\t Saved in", spath)
+    return stats
+
+
+def convert_fulldir_doteit_to_pickle(lpath: str, spath: str, n_workers: int = None) -> dict:
+    """
+    Converts all new or changed .eit files in a directory to .pickle files in a directory spath.
+
+    Parameters
+    ----------
+    lpath : str
+        load path
+    spath : str
+        save path
+    n_workers : int, optional
+        number of processes, by default os.cpu_count()
+
+    Returns
+    -------
+    dict
+        conversion statistics
+    """
+    return convert_fulldir_doteit(lpath, spath, "pickle", n_workers)
+
+
+def convert_fulldir_doteit_to_npz(lpath: str, spath: str, n_workers: int = None) -> dict:
+    """
+    Converts all new or changed .eit files in a directory to .npz files in a directory spath.
+
+    Parameters
+    ----------
+    lpath : str
+        load path
+    spath : str
+        save path
+    n_workers : int, optional
+        number of processes, by default os.cpu_count()
+
+    Returns
+    -------
+    dict
+        conversion statistics
+    """
+    return convert_fulldir_doteit(lpath, spath, "npz", n_workers)
+
+
+def convert_fulldir_doteit_to_npy(lpath: str, spath: str, n_workers: int = None) -> dict:
+    """
+    Converts all new or changed .eit files in a directory to the pickle-free .json/.npy format.
+
+    Parameters
+    ----------
+    lpath : str
+        load path
+    spath : str
+        save path
+    n_workers : int, optional
+        number of processes, by default os.cpu_count()
+
+    Returns
+    -------
+    dict
+        conversion statistics
+    """
+    return convert_fulldir_doteit(lpath, spath, "npy", n_workers)
+
+
+class DotEitWatcher:
+    """
+    Polls a directory for new or completed .eit files and converts each one once in a worker pool.
+    A file counts as completed when its mtime and size did not change between two polls.
+    The (mtime, size) of converted files are persisted in spath/.doteit_watch.json, so a restarted
+    watcher does not convert them again. A file whose conversion failed is retried only after its
+    mtime or size changed. No OS-specific notification API is used.
+
+    Parameters
+    ----------
+    lpath : str
+        directory the recordings land in
+    spath : str
+        save path
+    fmt : str, optional
+        "npz", "npy" or "pickle", by default "npz"
+    n_workers : int, optional
+        number of processes, by default os.cpu_count()
+    """
 
-        frame = doteit_in_SingleEitFrame(read_content)
-        np.savez(f"{spath}{frame.setup_name}.npz", **(frame.__dict__))
+    def __init__(self, lpath: str, spath: str, fmt: str = "npz", n_workers: int = None) -> None:
+        self.lpath = lpath
+        self.spath = spath
+        self.fmt = fmt
+        self.index_path = os.path.join(spath, ".doteit_watch.json")
+        self.converted = {}
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r") as f:
+                self.converted = {key: tuple(val) for key, val in json.load(f).items()}
+        self.last_seen = {}
+        self.pending = {}
+        self.failed = {}
+        self.pool = ProcessPoolExecutor(max_workers=n_workers)
+
+    def _save_index(self) -> None:
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.converted, f)
+        os.replace(tmp_path, self.index_path)
+
+    def poll(self) -> list:
+        """
+        Checks the directory once, submits completed files and collects finished conversions.
+
+        Returns
+        -------
+        list
+            files converted since the last poll
+        """
+        seen = {}
+        for obj in list_eit_files(self.lpath):
+            try:
+                stat = os.stat(os.path.join(self.lpath, obj))
+            except FileNotFoundError:
+                continue
+            state = (stat.st_mtime, stat.st_size)
+            seen[obj] = state
+            if obj in self.pending or state in (self.converted.get(obj), self.failed.get(obj)):
+                continue
+            if self.last_seen.get(obj) == state:
+                future = self.pool.submit(
+                    convert_single_doteit, os.path.join(self.lpath, obj), self.spath, self.fmt
+                )
+                self.pending[obj] = (future, state)
+        self.last_seen = seen
+
+        done = []
+        for obj, (future, state) in list(self.pending.items()):
+            if not future.done():
+                continue
+            del self.pending[obj]
+            try:
+                future.result()
+                self.converted[obj] = state
+                self.failed.pop(obj, None)
+                done.append(obj)
+                print("converted:", obj)
+            except Exception as e:
+                self.failed[obj] = state
+                print(f"failed: {obj} ({e})")
+        if done:
+            self._save_index()
+        return done
+
+    def run(self, interval: float = 2.0, max_polls: int = None) -> None:
+        """
+        Polls every interval seconds until max_polls is reached or KeyboardInterrupt.
+        """
+        n_polls = 0
+        try:
+            while max_polls is None or n_polls < max_polls:
+                self.poll()
+                n_polls += 1
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("Watcher stopped.")
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """
+        Waits for running conversions and stops the worker pool.
+        """
+        self.pool.shutdown(wait=True)
+        for obj, (future, state) in self.pending.items():
+            if future.exception() is None:
+                self.converted[obj] = state
+        self.pending = {}
+        self._save_index()
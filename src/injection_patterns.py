@@ -0,0 +1,111 @@
+""" Injection patterns and cached measurement selections of potential matrices"""
+
+import numpy as np
+from functools import lru_cache
+from typing import Tuple, Union
+
+
+def injection_pattern(n_el: int, inj_skip: Union[int, list] = 0) -> np.ndarray:
+    """
+    Builds the injection sequence of an EitMeasurementSetup in device numbering (1 ... n_el).
+
+    Parameters
+    ----------
+    n_el : int
+        number of electrodes
+    inj_skip : Union[int, list], optional
+        int: electrode i injects against electrode i + inj_skip + 1 (cyclic),
+        one injection per electrode
+        list of int: one skip per injecting electrode, len(inj_skip) == n_el
+        list of (inj, gnd) pairs: arbitrary injection sequence
+        by default 0
+
+    Returns
+    -------
+    np.ndarray
+        injection and ground electrode of every injection, shape (n_inj, 2)
+    """
+    el_inj = np.arange(1, n_el + 1)
+    if np.ndim(inj_skip) == 0:
+        pairs = np.stack([el_inj, np.roll(el_inj, -(int(inj_skip) + 1))], axis=1)
+    else:
+        inj_skip = np.asarray(inj_skip, dtype=int)
+        if inj_skip.ndim == 1:
+            if len(inj_skip) != n_el:
+                raise ValueError(
+                    f"A list of skips needs one skip per electrode ({n_el}), got {len(inj_skip)}."
+                )
+            pairs = np.stack([el_inj, (el_inj + inj_skip) % n_el + 1], axis=1)
+        elif inj_skip.ndim == 2 and inj_skip.shape[1] == 2:
+            pairs = inj_skip
+        else:
+            raise ValueError(
+                "inj_skip must be an int, a list of skips or a list of (inj, gnd) pairs."
+            )
+
+    # the same check for every form, a skip of n_el - 1 would inject against itself
+    if np.any(pairs < 1) or np.any(pairs > n_el) or np.any(pairs[:, 0] == pairs[:, 1]):
+        raise ValueError(f"Injection pairs must use two different electrodes between 1 and {n_el}.")
+    return pairs
+
+
+@lru_cache(maxsize=64)
+def _selection(n_el: int, pattern: bytes) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    pairs = np.frombuffer(pattern, dtype=int).reshape(-1, 2) - 1
+    mask = np.ones((len(pairs), n_el), dtype=bool)
+    rows = np.arange(len(pairs))
+    mask[rows, pairs[:, 0]] = False
+    mask[rows, pairs[:, 1]] = False
+    # row-major order: all electrodes of injection 1, then injection 2, ...
+    flat_idx = np.flatnonzero(mask)
+    pairs = pairs + 1
+    for arr in (mask, flat_idx, pairs):
+        arr.flags.writeable = False
+    return mask, flat_idx, pairs
+
+
+def measurement_selection(
+    n_el: int, inj_skip: Union[int, list] = 0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the cached selection of the measurements without excitation electrodes.
+    The boolean mask and the flat index array are computed once per pattern and are read only.
+
+    Parameters
+    ----------
+    n_el : int
+        number of electrodes
+    inj_skip : Union[int, list], optional
+        injection pattern, see injection_pattern, by default 0
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, np.ndarray]
+        mask of shape (n_inj, n_el), flat indices into the flattened potential matrix
+        and the injection pattern of shape (n_inj, 2)
+    """
+    pattern = np.ascontiguousarray(injection_pattern(n_el, inj_skip), dtype=int)
+    return _selection(n_el, pattern.tobytes())
+
+
+def get_v_without_ext(pot_mat: np.ndarray, inj_skip: Union[int, list] = 0) -> np.ndarray:
+    """
+    Extracts the reduced measurement vector v_without_ext from potential matrices,
+    i.e. all electrode potentials except the two current carrying electrodes of each injection.
+    The extraction is a single fancy index per frame.
+
+    Parameters
+    ----------
+    pot_mat : np.ndarray
+        potential matrix of shape (..., n_inj, n_el), see get_data_as_matrix
+    inj_skip : Union[int, list], optional
+        injection pattern of the measurement, by default 0
+
+    Returns
+    -------
+    np.ndarray
+        reduced measurement vectors of shape (..., n_meas)
+    """
+    n_el = pot_mat.shape[-1]
+    _, flat_idx, _ = measurement_selection(n_el, inj_skip)
+    return pot_mat.reshape(*pot_mat.shape[:-2], -1)[..., flat_idx]
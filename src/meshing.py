@@ -1,21 +1,174 @@
-from typing import Union
+import os
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple, Union
 import matplotlib.pyplot as plt
+import matplotlib.tri as mtri
 import numpy as np
+import scipy.sparse as sparse
 
 import pyeit.mesh as mesh
 from pyeit.mesh import PyEITMesh
+from pyeit.mesh import shape
 from pyeit.mesh.wrapper import PyEITAnomaly_Circle
 
 
+# distance functions of the supported mesh geometries
+geometries = {"circle": shape.circle}
+
+# persistent mesh cache, can be redirected with the environment variable SCIOPY_MESH_CACHE
+mesh_cache_dir = os.environ.get(
+    "SCIOPY_MESH_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "sciopy", "meshes")
+)
+mesh_cache_size = 32
+_mesh_cache = OrderedDict()
+_pixel_map_cache = OrderedDict()
+
+
+def _load_or_create_mesh_arrays(
+    n_el: int, h0: float, geometry: str
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Loads the node/element arrays of a 2D mesh from the disk cache or creates them with distmesh.
+    """
+    fname = os.path.join(mesh_cache_dir, f"{geometry}_nel{n_el}_h0{h0:g}.npz")
+    if os.path.exists(fname):
+        with np.load(fname) as cached:
+            return cached["node"], cached["element"], cached["el_pos"]
+
+    mesh_obj = mesh.create(n_el=n_el, fd=geometries[geometry], h0=h0)
+    os.makedirs(mesh_cache_dir, exist_ok=True)
+    tmp_name = f"{fname}.{os.getpid()}.tmp"
+    with open(tmp_name, "wb") as f:
+        np.savez(f, node=mesh_obj.node, element=mesh_obj.element, el_pos=mesh_obj.el_pos)
+    os.replace(tmp_name, fname)
+    return mesh_obj.node, mesh_obj.element, mesh_obj.el_pos
+
+
+def electrode_order(
+    n_el: int, first_angle: float = -90.0, counterclockwise: bool = True
+) -> np.ndarray:
+    """
+    Maps the device electrode numbering onto the boundary points of a pyeit circle mesh.
+    pyeit places boundary point j at the angle 180 - j * 360 / n_el degrees; the device electrode 1
+    sits at first_angle and the following electrodes are numbered in the given direction.
+    The defaults reproduce the ScioSpec tank layout, for 16 electrodes np.roll(np.arange(16)[::-1], -3).
+
+    Parameters
+    ----------
+    n_el : int
+        number of electrodes
+    first_angle : float, optional
+        angle of electrode 1 in degrees, by default -90.0 (bottom of the tank)
+    counterclockwise : bool, optional
+        numbering direction, by default True
+
+    Returns
+    -------
+    np.ndarray
+        index of the boundary point of every electrode, shape (n_el,)
+    """
+    first = int(np.round((180.0 - first_angle) * n_el / 360.0)) % n_el
+    step = -1 if counterclockwise else 1
+    return (first + step * np.arange(n_el)) % n_el
+
+
+def get_cached_mesh_arrays(
+    n_el: int = 16,
+    h0: float = 0.1,
+    z_level: Union[int, float] = 0,
+    geometry: str = "circle",
+    el_first_angle: float = -90.0,
+    el_counterclockwise: bool = True,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns read only node, element and el_pos arrays of a 2D mesh.
+    The arrays are kept in memory with LRU eviction (mesh_cache_size entries) and the triangulation
+    is persisted to mesh_cache_dir as .npz, so distmesh runs only once per (n_el, h0, geometry).
+    Different z-levels and electrode orientations share the triangulation.
+
+    Parameters
+    ----------
+    n_el : int, optional
+        number of used electrodes, by default 16
+    h0 : float, optional
+        mesh refinement, by default 0.1
+    z_level : Union[int, float], optional
+        z-level of this 2d mesh, by default 0
+    geometry : str, optional
+        geometry of the mesh, key of `geometries`, by default "circle"
+    el_first_angle : float, optional
+        angle of electrode 1 in degrees, by default -90.0 (see electrode_order)
+    el_counterclockwise : bool, optional
+        electrode numbering direction, by default True
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, np.ndarray]
+        node, element and el_pos (el_pos[k] is the node of device electrode k + 1)
+    """
+    if geometry not in geometries:
+        raise ValueError(f"Unknown geometry: {geometry}. Available: {list(geometries)}")
+    key = (
+        n_el,
+        float(h0),
+        float(z_level),
+        geometry,
+        float(el_first_angle),
+        bool(el_counterclockwise),
+    )
+    if key in _mesh_cache:
+        _mesh_cache.move_to_end(key)
+        return _mesh_cache[key][:3]
+
+    base = next(
+        (val for k, val in _mesh_cache.items() if (k[0], k[1], k[3]) == (key[0], key[1], key[3])),
+        None,
+    )
+    if base is not None:
+        node, element, base_el_pos = base[0], base[1], base[3]
+    else:
+        node, element, base_el_pos = _load_or_create_mesh_arrays(n_el, h0, geometry)
+    node = node.copy()
+    node[:, 2] = z_level
+    el_pos = base_el_pos[electrode_order(n_el, el_first_angle, el_counterclockwise)]
+    for arr in (node, element, el_pos, base_el_pos):
+        arr.flags.writeable = False
+
+    _mesh_cache[key] = (node, element, el_pos, base_el_pos)
+    while len(_mesh_cache) > mesh_cache_size:
+        _mesh_cache.popitem(last=False)
+    return node, element, el_pos
+
+
+def clear_mesh_cache(disk: bool = False) -> None:
+    """
+    Empties the in-memory mesh cache and optionally the persisted meshes.
+    """
+    _mesh_cache.clear()
+    _pixel_map_cache.clear()
+    if disk and os.path.isdir(mesh_cache_dir):
+        for obj in os.listdir(mesh_cache_dir):
+            if obj.endswith(".npz"):
+                os.remove(os.path.join(mesh_cache_dir, obj))
+
+
 def create_empty_2d_mesh(
     n_el: int = 16,
     h0: float = 0.1,
     z_level: Union[int, float] = 0,
     default_perm: float = 1.0,
+    geometry: str = "circle",
+    el_first_angle: float = -90.0,
+    el_counterclockwise: bool = True,
 ) -> PyEITMesh:
     """
     Creates an empty mesh object.
     With a view to 3D reconstruction, a z-level can also be assigned.
+    Node and element arrays come from the mesh cache (see get_cached_mesh_arrays) and are read only;
+    every mesh object gets its own permittivity array, so anomalies never modify the cached mesh.
+    The electrode placement is derived from n_el and the orientation (see electrode_order).
 
     Parameters
     ----------
@@ -27,18 +180,33 @@ def create_empty_2d_mesh(
         z-level of this 2d mesh, by default 0
     default_perm : float
         empty ground permittivity value
+    geometry : str, optional
+        geometry of the mesh, by default "circle"
+    el_first_angle : float, optional
+        angle of electrode 1 in degrees, by default -90.0
+    el_counterclockwise : bool, optional
+        electrode numbering direction, by default True
 
     Returns
     -------
     PyEITMesh
         pyeit mesh object
     """
-    mesh_obj = mesh.create(n_el=n_el, h0=h0)
-    mesh_obj.node[:, 2] = z_level
-    mesh_obj.el_pos = np.roll(np.arange(16)[::-1], -3)
-    if default_perm != 1.0:
-        mesh_obj.perm_array = mesh_obj.perm_array * default_perm
-        mesh_obj.perm = default_perm
+    node, element, el_pos = get_cached_mesh_arrays(
+        n_el=n_el,
+        h0=h0,
+        z_level=z_level,
+        geometry=geometry,
+        el_first_angle=el_first_angle,
+        el_counterclockwise=el_counterclockwise,
+    )
+    mesh_obj = PyEITMesh(
+        node=node,
+        element=element,
+        perm=default_perm,
+        el_pos=el_pos,
+        ref_node=0,
+    )
 
     return mesh_obj
 
@@ -172,3 +340,533 @@ def mesh_sample(
         print("This kind of object geometry has to be implementet.")
         print("\tReturn empty mesh")
         return mesh_obj
+
+
+def circle_perm_labels(
+    centroids: np.ndarray,
+    centers: np.ndarray,
+    radii: np.ndarray,
+    empty_perm: float = 1.0,
+    obj_perm: float = 10.0,
+    dtype: np.dtype = np.float32,
+) -> np.ndarray:
+    """
+    Assigns circle anomalies of many samples to the elements of one mesh in a single distance test.
+    An element belongs to an anomaly if its centroid lies inside the circle (as pyeit.mesh.set_perm).
+
+    Parameters
+    ----------
+    centroids : np.ndarray
+        element centroids of shape (n_elements, >=2)
+    centers : np.ndarray
+        anomaly centers of shape (n_samples, 2)
+    radii : np.ndarray
+        anomaly radii of shape (n_samples,); NaN for samples without anomaly
+    empty_perm : float, optional
+        permittivity of the empty area, by default 1.0
+    obj_perm : float, optional
+        permittivity of the object, by default 10.0
+    dtype : np.dtype, optional
+        dtype of the labels, by default np.float32
+
+    Returns
+    -------
+    np.ndarray
+        perm labels of shape (n_samples, n_elements)
+    """
+    d_x = centroids[np.newaxis, :, 0] - centers[:, 0, np.newaxis]
+    d_y = centroids[np.newaxis, :, 1] - centers[:, 1, np.newaxis]
+    inside = d_x**2 + d_y**2 < (radii**2)[:, np.newaxis]
+    return np.where(inside, obj_perm, empty_perm).astype(dtype)
+
+
+def _sample_anomaly(
+    sample, x_y_offset: float, tank_r_inner: float
+) -> Tuple[float, float, float, int]:
+    # center relating the unit circle, radius (NaN for other objects) and n_el of one sample
+    if isinstance(sample, str):
+        with np.load(sample, allow_pickle=True) as npz:
+            return _sample_anomaly(npz, x_y_offset, tank_r_inner)
+    ender_stat = sample["enderstat"].tolist()
+    cnfg = sample["config"].tolist()
+    radius = cnfg.size if cnfg.object == "circle" else np.nan
+    return (
+        (ender_stat["abs_x_pos"] - x_y_offset) / tank_r_inner,
+        (ender_stat["abs_y_pos"] - x_y_offset) / tank_r_inner,
+        radius,
+        cnfg.n_el,
+    )
+
+
+def mesh_samples_chunk(
+    samples: list,
+    n_el: int,
+    h0: float,
+    empty_perm: float,
+    obj_perm: float,
+    x_y_offset: float,
+    tank_r_inner: float,
+) -> np.ndarray:
+    """
+    Loads a chunk of samples and returns their perm labels, see mesh_samples_batch.
+    Runs in the worker processes, which read the .npz files and the cached base mesh themselves.
+    """
+    anomalies = np.array(
+        [_sample_anomaly(sample, x_y_offset, tank_r_inner) for sample in samples], dtype=float
+    ).reshape(-1, 4)
+    n_els = set(anomalies[:, 3].astype(int).tolist()) - {n_el}
+    if n_els:
+        raise ValueError(
+            f"All samples need the same number of electrodes, got {sorted(n_els | {n_el})}."
+        )
+    node, element, _ = get_cached_mesh_arrays(n_el=n_el, h0=h0)
+    centroids = np.mean(node[element], axis=1)
+    return circle_perm_labels(centroids, anomalies[:, :2], anomalies[:, 2], empty_perm, obj_perm)
+
+
+def mesh_samples_batch(
+    samples: list,
+    h0: float = 0.05,
+    empty_perm: float = 1.0,
+    obj_perm: float = 10.0,
+    x_y_offset: float = 180,
+    tank_r_inner: float = 97.0,
+    n_workers: int = None,
+    chunk_size: int = 4096,
+) -> np.ndarray:
+    """
+    Generates the perm labels of many measured samples on one shared base mesh.
+    The element centroids are computed once per process and the circle anomalies are assigned vectorized.
+    Batches larger than chunk_size are split across a process pool; every worker loads its own chunk
+    of .npz files, so only paths and labels cross the process boundary.
+    Samples with other object geometries keep the empty permittivity.
+
+    Parameters
+    ----------
+    samples : list
+        loaded samples (np.lib.npyio.NpzFile) or paths to the .npz files,
+        loaded samples are processed in this process
+    h0 : float, optional
+        mesh refinement, by default 0.05
+    empty_perm : float, optional
+        permittivity of the empty area, by default 1.0
+    obj_perm : float, optional
+        permittivity of the object, by default 10.0
+    x_y_offset : float, optional
+        x,y offset due to the Ender 5, by default 180
+    tank_r_inner : float, optional
+        inner radius of the ScioSpecEIT phantom tank, by default 97.0
+    n_workers : int, optional
+        number of processes, by default os.cpu_count()
+    chunk_size : int, optional
+        samples per worker task, by default 4096
+
+    Returns
+    -------
+    np.ndarray
+        perm labels of shape (n_samples, n_elements)
+    """
+    n_el = _sample_anomaly(samples[0], x_y_offset, tank_r_inner)[3] if len(samples) else 16
+    # create the base mesh once, the workers load it from the mesh cache
+    get_cached_mesh_arrays(n_el=n_el, h0=h0)
+    args = (n_el, h0, empty_perm, obj_perm, x_y_offset, tank_r_inner)
+
+    starts = range(0, len(samples), chunk_size)
+    chunks = [list(samples[i : i + chunk_size]) for i in starts]
+    parallel = len(chunks) > 1 and n_workers != 1 and all(isinstance(s, str) for s in samples)
+    if not parallel:
+        return mesh_samples_chunk(list(samples), *args)
+
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        labels = pool.map(mesh_samples_chunk, chunks, *[[arg] * len(chunks) for arg in args])
+        return np.concatenate(list(labels))
+
+
+class StackedMesh:
+    """
+    Multi-layer 3D mesh built from one cached 2D triangulation.
+    Layer k consists of the base nodes at z_levels[k]; node j of layer k has the index
+    k * n_base_nodes + j, so layers are addressed through offsets and the 2D arrays are never copied
+    per layer. Neighbouring layers are connected by prisms, one per base triangle and slab.
+    The permittivity is stored per prism in perm_array of shape (n_slabs * n_base_elements,).
+
+    Parameters
+    ----------
+    node : np.ndarray
+        base nodes of shape (n_base_nodes, 3), e.g. from get_cached_mesh_arrays
+    element : np.ndarray
+        base triangles of shape (n_base_elements, 3)
+    el_pos : np.ndarray
+        base electrode nodes
+    z_levels : np.ndarray
+        ascending z-levels of the layers
+    default_perm : float, optional
+        empty ground permittivity value, by default 1.0
+    """
+
+    def __init__(
+        self,
+        node: np.ndarray,
+        element: np.ndarray,
+        el_pos: np.ndarray,
+        z_levels: np.ndarray,
+        default_perm: float = 1.0,
+    ) -> None:
+        z_levels = np.asarray(z_levels, dtype=float)
+        if z_levels.ndim != 1 or len(z_levels) < 2 or np.any(np.diff(z_levels) <= 0):
+            raise ValueError("z_levels must contain at least two ascending values.")
+        self.base_node = node
+        self.base_element = element
+        self.base_el_pos = el_pos
+        self.z_levels = z_levels
+        self.n_base_nodes = len(node)
+        self.n_base_elements = len(element)
+        self.node_offsets = np.arange(len(z_levels)) * self.n_base_nodes
+        self.base_centers = np.mean(node[element][:, :, :2], axis=1)
+        self.slab_centers = (z_levels[:-1] + z_levels[1:]) / 2
+        self.perm_array = np.full(self.n_elems, default_perm, dtype=float)
+
+    @property
+    def n_layers(self) -> int:
+        return len(self.z_levels)
+
+    @property
+    def n_nodes(self) -> int:
+        return self.n_layers * self.n_base_nodes
+
+    @property
+    def n_elems(self) -> int:
+        return (self.n_layers - 1) * self.n_base_elements
+
+    @property
+    def node(self) -> np.ndarray:
+        """
+        All nodes of shape (n_nodes, 3), layer by layer.
+        """
+        xy = np.broadcast_to(self.base_node[:, :2], (self.n_layers, self.n_base_nodes, 2))
+        z = np.broadcast_to(
+            self.z_levels[:, np.newaxis, np.newaxis], (self.n_layers, self.n_base_nodes, 1)
+        )
+        return np.concatenate([xy, z], axis=2).reshape(-1, 3)
+
+    @property
+    def element(self) -> np.ndarray:
+        """
+        Prisms of shape (n_elems, 6), bottom triangle followed by top triangle, slab by slab.
+        """
+        offsets = self.node_offsets[:-1, np.newaxis, np.newaxis]
+        bottom = self.base_element[np.newaxis] + offsets
+        top = bottom + self.n_base_nodes
+        return np.concatenate([bottom, top], axis=2).reshape(-1, 6)
+
+    @property
+    def elem_centers(self) -> np.ndarray:
+        """
+        Prism centers of shape (n_elems, 3).
+        """
+        xy = np.broadcast_to(self.base_centers, (self.n_layers - 1, self.n_base_elements, 2))
+        z = np.broadcast_to(
+            self.slab_centers[:, np.newaxis, np.newaxis], (self.n_layers - 1, self.n_base_elements, 1)
+        )
+        return np.concatenate([xy, z], axis=2).reshape(-1, 3)
+
+    def tetrahedra(self) -> np.ndarray:
+        """
+        Splits every prism into three tetrahedra, e.g. for a 3D FEM forward model.
+        The vertices of each base triangle are sorted by index, so the splits of neighbouring prisms
+        share their faces.
+
+        Returns
+        -------
+        np.ndarray
+            tetrahedra of shape (3 * n_elems, 4); prism i yields the rows 3i to 3i + 2
+        """
+        base = np.sort(self.base_element, axis=1)
+        offsets = self.node_offsets[:-1, np.newaxis]
+        a, b, c = (base[np.newaxis, :, k] + offsets for k in range(3))
+        a_t, b_t, c_t = a + self.n_base_nodes, b + self.n_base_nodes, c + self.n_base_nodes
+        tets = np.stack(
+            [
+                np.stack([a, b, c, a_t], axis=-1),
+                np.stack([b, c, a_t, b_t], axis=-1),
+                np.stack([c, a_t, b_t, c_t], axis=-1),
+            ],
+            axis=2,
+        )
+        return tets.reshape(-1, 4)
+
+    def layer_el_pos(self, k: int) -> np.ndarray:
+        """
+        Electrode nodes of layer k.
+        """
+        return self.base_el_pos + self.node_offsets[k]
+
+    def slab_perm(self, k: int) -> np.ndarray:
+        """
+        Permittivity of slab k (between layer k and k + 1) as view of shape (n_base_elements,).
+        """
+        return self.perm_array.reshape(self.n_layers - 1, self.n_base_elements)[k]
+
+    def layer_mesh(self, k: int) -> PyEITMesh:
+        """
+        2D pyeit mesh of slab k at the center z-level of the slab, sharing the cached base arrays.
+        """
+        node = self.base_node.copy()
+        node[:, 2] = self.slab_centers[k]
+        return PyEITMesh(
+            node=node,
+            element=self.base_element,
+            perm=self.slab_perm(k).copy(),
+            el_pos=self.base_el_pos,
+            ref_node=0,
+        )
+
+
+def create_stacked_3d_mesh(
+    n_el: int = 16,
+    h0: float = 0.1,
+    z_levels: np.ndarray = (0.0, 1.0),
+    default_perm: float = 1.0,
+    geometry: str = "circle",
+    el_first_angle: float = -90.0,
+    el_counterclockwise: bool = True,
+) -> StackedMesh:
+    """
+    Creates an empty multi-layer mesh from the cached 2D mesh (see get_cached_mesh_arrays).
+    Memory and build time grow linearly with the number of layers, distmesh runs at most once.
+
+    Parameters
+    ----------
+    n_el : int, optional
+        number of used electrodes, by default 16
+    h0 : float, optional
+        mesh refinement, by default 0.1
+    z_levels : np.ndarray, optional
+        ascending z-levels of the layers, by default (0.0, 1.0)
+    default_perm : float, optional
+        empty ground permittivity value, by default 1.0
+    geometry : str, optional
+        geometry of the mesh, by default "circle"
+    el_first_angle : float, optional
+        angle of electrode 1 in degrees, by default -90.0
+    el_counterclockwise : bool, optional
+        electrode numbering direction, by default True
+
+    Returns
+    -------
+    StackedMesh
+        stacked mesh object
+    """
+    node, element, el_pos = get_cached_mesh_arrays(
+        n_el=n_el,
+        h0=h0,
+        geometry=geometry,
+        el_first_angle=el_first_angle,
+        el_counterclockwise=el_counterclockwise,
+    )
+    return StackedMesh(node, element, el_pos, z_levels, default_perm)
+
+
+def anomaly_perm_labels_3d(
+    elem_centers: np.ndarray,
+    centers: np.ndarray,
+    radii: np.ndarray,
+    heights: np.ndarray = None,
+    empty_perm: float = 1.0,
+    obj_perm: float = 10.0,
+    dtype: np.dtype = np.float32,
+) -> np.ndarray:
+    """
+    Assigns 3D anomalies of many samples to the elements of one stacked mesh in a single distance test.
+    Without heights the anomalies are spheres, otherwise vertical cylinders centered at the given z.
+
+    Parameters
+    ----------
+    elem_centers : np.ndarray
+        element centers of shape (n_elements, 3), e.g. StackedMesh.elem_centers
+    centers : np.ndarray
+        anomaly centers of shape (n_samples, 3)
+    radii : np.ndarray
+        anomaly radii of shape (n_samples,); NaN for samples without anomaly
+    heights : np.ndarray, optional
+        cylinder heights of shape (n_samples,), by default None (spheres)
+    empty_perm : float, optional
+        permittivity of the empty area, by default 1.0
+    obj_perm : float, optional
+        permittivity of the object, by default 10.0
+    dtype : np.dtype, optional
+        dtype of the labels, by default np.float32
+
+    Returns
+    -------
+    np.ndarray
+        perm labels of shape (n_samples, n_elements)
+    """
+    centers = np.atleast_2d(centers)
+    radii = np.atleast_1d(radii)
+    d_x = elem_centers[np.newaxis, :, 0] - centers[:, 0, np.newaxis]
+    d_y = elem_centers[np.newaxis, :, 1] - centers[:, 1, np.newaxis]
+    d_z = elem_centers[np.newaxis, :, 2] - centers[:, 2, np.newaxis]
+    if heights is None:
+        inside = d_x**2 + d_y**2 + d_z**2 < (radii**2)[:, np.newaxis]
+    else:
+        half = np.atleast_1d(heights)[:, np.newaxis] / 2
+        inside = (d_x**2 + d_y**2 < (radii**2)[:, np.newaxis]) & (np.abs(d_z) <= half)
+    return np.where(inside, obj_perm, empty_perm).astype(dtype)
+
+
+def add_3d_anomaly(
+    stacked_mesh: StackedMesh,
+    center: tuple,
+    radius: float,
+    height: float = None,
+    perm: float = 10,
+) -> StackedMesh:
+    """
+    Adds a sphere (or with height a vertical cylinder) anomaly to a stacked mesh in place.
+
+    Parameters
+    ----------
+    stacked_mesh : StackedMesh
+        input mesh object
+    center : tuple
+        (x, y, z) center of the anomaly
+    radius : float
+        radius of the anomaly in percent relating the unit circle
+    height : float, optional
+        height of a cylinder anomaly, by default None (sphere)
+    perm : float, optional
+        permittivity of the anomaly, by default 10
+
+    Returns
+    -------
+    StackedMesh
+        the modified mesh object
+    """
+    inside = anomaly_perm_labels_3d(
+        stacked_mesh.elem_centers,
+        np.asarray(center, dtype=float),
+        radius,
+        None if height is None else np.asarray([height], dtype=float),
+        empty_perm=0.0,
+        obj_perm=1.0,
+        dtype=bool,
+    )[0]
+    stacked_mesh.perm_array[inside] = perm
+    return stacked_mesh
+
+
+def get_pixel_mapping(
+    mesh_obj: Union[PyEITMesh, StackedMesh],
+    n_pixels: int = 64,
+    supersample: int = 1,
+) -> sparse.csr_matrix:
+    """
+    Returns the sparse mapping from the mesh elements to an n_pixels x n_pixels grid over the
+    bounding box of the mesh. Every pixel averages the elements under those of its
+    supersample x supersample sample points that lie inside the mesh; pixels entirely outside
+    the mesh are zero. The mapping depends only on the triangulation, it is kept in memory
+    (LRU, mesh_cache_size entries) and persisted to mesh_cache_dir.
+
+    Parameters
+    ----------
+    mesh_obj : Union[PyEITMesh, StackedMesh]
+        mesh object, for a StackedMesh the base triangulation (one slab) is mapped
+    n_pixels : int, optional
+        pixels per side, by default 64
+    supersample : int, optional
+        sample points per pixel side, by default 1 (pixel centers)
+
+    Returns
+    -------
+    sparse.csr_matrix
+        mapping of shape (n_pixels * n_pixels, n_elems)
+    """
+    if isinstance(mesh_obj, StackedMesh):
+        node, element = mesh_obj.base_node, mesh_obj.base_element
+    else:
+        node, element = mesh_obj.node, mesh_obj.element
+    h = hashlib.sha256()
+    h.update(np.ascontiguousarray(node[:, :2]).tobytes())
+    h.update(np.ascontiguousarray(element).tobytes())
+    key = f"{h.hexdigest()[:32]}_px{n_pixels}_ss{supersample}_avg"
+    if key in _pixel_map_cache:
+        _pixel_map_cache.move_to_end(key)
+        return _pixel_map_cache[key]
+
+    fname = os.path.join(mesh_cache_dir, f"pixelmap_{key}.npz")
+    if os.path.exists(fname):
+        mapping = sparse.load_npz(fname).tocsr()
+    else:
+        x_min, y_min = node[:, :2].min(axis=0)
+        x_max, y_max = node[:, :2].max(axis=0)
+        n_sub = n_pixels * supersample
+        # sample points at the centers of the sub-pixels, row 0 is the top of the image
+        xs = x_min + (np.arange(n_sub) + 0.5) * (x_max - x_min) / n_sub
+        ys = y_max - (np.arange(n_sub) + 0.5) * (y_max - y_min) / n_sub
+        grid_x, grid_y = np.meshgrid(xs, ys)
+        triang = mtri.Triangulation(node[:, 0], node[:, 1], element)
+        elems = triang.get_trifinder()(grid_x, grid_y)
+        sub_row, sub_col = np.divmod(np.arange(n_sub * n_sub), n_sub)
+        pixel = (sub_row // supersample) * n_pixels + sub_col // supersample
+        inside = elems.ravel() >= 0
+        mapping = sparse.csr_matrix(
+            (
+                np.ones(inside.sum()),
+                (pixel[inside], elems.ravel()[inside]),
+            ),
+            shape=(n_pixels * n_pixels, len(element)),
+        )
+        mapping.sum_duplicates()
+        # normalize by the sample points inside the mesh, so boundary pixels are not darkened
+        n_inside = np.bincount(pixel[inside], minlength=n_pixels * n_pixels)
+        scale = np.divide(1.0, n_inside, out=np.zeros(len(n_inside)), where=n_inside > 0)
+        mapping = (sparse.diags(scale) @ mapping).tocsr()
+        os.makedirs(mesh_cache_dir, exist_ok=True)
+        tmp_name = f"{fname}.{os.getpid()}.tmp.npz"
+        sparse.save_npz(tmp_name, mapping)
+        os.replace(tmp_name, fname)
+
+    _pixel_map_cache[key] = mapping
+    while len(_pixel_map_cache) > mesh_cache_size:
+        _pixel_map_cache.popitem(last=False)
+    return mapping
+
+
+def perm_to_image(
+    values: np.ndarray,
+    mesh_obj: Union[PyEITMesh, StackedMesh],
+    n_pixels: int = 64,
+    supersample: int = 1,
+) -> np.ndarray:
+    """
+    Converts per element values (perm_array, perm labels or reconstructions) into pixel images
+    with one sparse matrix product (see get_pixel_mapping).
+
+    For a StackedMesh one image per slab is returned, values of one slab (slab_perm) give one image.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        values of shape (n_elems,) or (n_samples, n_elems)
+    mesh_obj : Union[PyEITMesh, StackedMesh]
+        mesh object of the values
+    n_pixels : int, optional
+        pixels per side, by default 64
+    supersample : int, optional
+        sample points per pixel side, by default 1
+
+    Returns
+    -------
+    np.ndarray
+        images of shape (n_pixels, n_pixels) or (n_samples, n_pixels, n_pixels);
+        for a StackedMesh (n_slabs, n_pixels, n_pixels) or (n_samples, n_slabs, n_pixels, n_pixels)
+    """
+    mapping = get_pixel_mapping(mesh_obj, n_pixels, supersample)
+    values = np.asarray(values)
+    shape = values.shape[:-1]
+    if isinstance(mesh_obj, StackedMesh) and values.shape[-1] != mapping.shape[1]:
+        # all slabs (perm_array); values of a single slab (slab_perm) map directly
+        shape = (*shape, mesh_obj.n_layers - 1)
+    flat = values.reshape(-1, mapping.shape[1])
+    return (mapping @ flat.T).T.reshape(*shape, n_pixels, n_pixels)
@@ -0,0 +1,326 @@
+""" Linear EIT reconstruction with cached sensitivity and reconstruction matrices"""
+
+import os
+import hashlib
+import queue
+import threading
+import time
+import numpy as np
+from typing import Callable, Tuple, Union
+
+from pyeit.mesh import PyEITMesh
+import pyeit.eit.protocol as protocol
+from pyeit.eit.jac import JAC
+
+from .injection_patterns import injection_pattern
+
+
+# persistent reconstruction cache, can be redirected with the environment variable SCIOPY_RECON_CACHE
+reconstruction_cache_dir = os.environ.get(
+    "SCIOPY_RECON_CACHE",
+    os.path.join(os.path.expanduser("~"), ".cache", "sciopy", "reconstruction"),
+)
+
+
+def create_protocol(n_el: int = 16, inj_skip: Union[int, list] = 0) -> protocol.PyEITProtocol:
+    """
+    Creates the pyeit protocol matching EIT_16_32_64_128.SetMeasurementSetup:
+    the excitations follow the injection pattern of inj_skip (see injection_pattern),
+    adjacent electrodes are measured and measurements on current carrying electrodes are excluded.
+
+    Parameters
+    ----------
+    n_el : int, optional
+        number of electrodes, by default 16
+    inj_skip : Union[int, list], optional
+        injection pattern as in EitMeasurementSetup.inj_skip, by default 0
+
+    Returns
+    -------
+    protocol.PyEITProtocol
+        pyeit protocol
+    """
+    ex_mat = injection_pattern(n_el, inj_skip) - 1
+    m = np.arange(n_el)
+    n = (m + 1) % n_el
+    n_kept = {int(np.sum((m != a) & (m != b) & (n != a) & (n != b))) for a, b in ex_mat}
+    if len(n_kept) > 1:
+        raise ValueError(
+            "pyeit needs the same number of measurements per injection; mixing adjacent and "
+            "non-adjacent injection pairs excludes a different number of measurements."
+        )
+    meas_mat, keep_ba = protocol.build_meas_pattern_std(ex_mat, n_el, 1, "std")
+    return protocol.PyEITProtocol(ex_mat, meas_mat, keep_ba)
+
+
+def pot_mat_to_meas(pot_mat: np.ndarray, protocol_obj: protocol.PyEITProtocol) -> np.ndarray:
+    """
+    Converts potential matrices (see get_data_as_matrix) into pyeit measurement vectors.
+    For injection i the differential voltage of the pair [N, M] is pot_mat[i, N] - pot_mat[i, M].
+
+    Parameters
+    ----------
+    pot_mat : np.ndarray
+        potential matrix of shape (..., n_inj, n_el)
+    protocol_obj : protocol.PyEITProtocol
+        pyeit protocol
+
+    Returns
+    -------
+    np.ndarray
+        measurement vectors of shape (..., n_meas_tot)
+    """
+    meas_mat = protocol_obj.meas_mat
+    exc_idx = np.arange(protocol_obj.n_exc)[:, np.newaxis]
+    v = pot_mat[..., exc_idx, meas_mat[..., 0]] - pot_mat[..., exc_idx, meas_mat[..., 1]]
+    return v.reshape(*pot_mat.shape[:-2], -1)
+
+
+def reconstruction_key(
+    mesh_obj: PyEITMesh, n_el: int, inj_skip: Union[int, list], **params
+) -> str:
+    """
+    Hash of everything the reconstruction matrix depends on.
+    The injection pattern is hashed, so equivalent forms of inj_skip share a key.
+    """
+    h = hashlib.sha256()
+    pattern = np.ascontiguousarray(injection_pattern(n_el, inj_skip), dtype=np.int64)
+    for arr in (mesh_obj.node, mesh_obj.element, mesh_obj.el_pos, mesh_obj.perm_array, pattern):
+        h.update(np.ascontiguousarray(arr).tobytes())
+    h.update(repr((n_el, sorted(params.items()))).encode())
+    return h.hexdigest()[:32]
+
+
+def get_reconstruction_matrices(
+    mesh_obj: PyEITMesh,
+    n_el: int = 16,
+    inj_skip: Union[int, list] = 0,
+    p: float = 0.5,
+    lamb: float = 0.01,
+    method: str = "kotre",
+    jac_normalized: bool = False,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Returns the Jacobian, the reference measurement of the forward model and the regularized
+    reconstruction matrix H = (J^T J + lamb R)^-1 J^T. The matrices are computed once and cached
+    on disk by a hash of the mesh, the electrode count, the injection pattern and the parameters.
+
+    Parameters
+    ----------
+    mesh_obj : PyEITMesh
+        mesh object
+    n_el : int, optional
+        number of electrodes, by default 16
+    inj_skip : Union[int, list], optional
+        injection pattern as in EitMeasurementSetup.inj_skip, by default 0
+    p : float, optional
+        regularization exponent, by default 0.5
+    lamb : float, optional
+        regularization parameter, by default 0.01
+    method : str, optional
+        regularization method "kotre", "lm" or "dgn", by default "kotre"
+    jac_normalized : bool, optional
+        normalize the Jacobian, by default False
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, np.ndarray]
+        Jacobian, forward reference measurement v0 and reconstruction matrix H
+    """
+    params = {"p": p, "lamb": lamb, "method": method, "jac_normalized": jac_normalized}
+    key = reconstruction_key(mesh_obj, n_el, inj_skip, **params)
+    fname = os.path.join(reconstruction_cache_dir, f"{key}.npz")
+    if os.path.exists(fname):
+        with np.load(fname) as cached:
+            return cached["jac"], cached["v0"], cached["H"]
+
+    solver = JAC(mesh_obj, create_protocol(n_el, inj_skip))
+    solver.setup(p=p, lamb=lamb, method=method, jac_normalized=jac_normalized)
+    os.makedirs(reconstruction_cache_dir, exist_ok=True)
+    tmp_name = f"{fname}.{os.getpid()}.tmp"
+    with open(tmp_name, "wb") as f:
+        np.savez(f, jac=solver.J, v0=solver.v0, H=solver.H)
+    os.replace(tmp_name, fname)
+    return solver.J, solver.v0, solver.H
+
+
+class LinearReconstructor:
+    """
+    Difference imaging with a precomputed reconstruction matrix.
+    Reconstructing a frame is one matrix-vector product, a stack of frames one matrix product.
+
+    Parameters
+    ----------
+    mesh_obj : PyEITMesh
+        mesh object
+    n_el : int, optional
+        number of electrodes, by default 16
+    inj_skip : Union[int, list], optional
+        injection pattern as in EitMeasurementSetup.inj_skip, by default 0
+    **params
+        regularization parameters of get_reconstruction_matrices
+    """
+
+    def __init__(
+        self, mesh_obj: PyEITMesh, n_el: int = 16, inj_skip: Union[int, list] = 0, **params
+    ) -> None:
+        self.mesh_obj = mesh_obj
+        self.n_el = n_el
+        self.inj_skip = inj_skip
+        self.protocol = create_protocol(n_el, inj_skip)
+        self.jac, self.v0, self.H = get_reconstruction_matrices(mesh_obj, n_el, inj_skip, **params)
+        # ds = -H dv  <=>  ds = dv @ (-H^T), so a batch of frames is one BLAS call
+        self.R = np.ascontiguousarray(-self.H.T)
+
+    def reconstruct(
+        self, pot_mat: np.ndarray, ref_pot_mat: np.ndarray, normalize: bool = False
+    ) -> np.ndarray:
+        """
+        Reconstructs the conductivity change between potential matrices and a reference.
+
+        Parameters
+        ----------
+        pot_mat : np.ndarray
+            potential matrix of shape (n_inj, n_el) or (n_frames, n_inj, n_el)
+        ref_pot_mat : np.ndarray
+            reference potential matrix of shape (n_inj, n_el)
+        normalize : bool, optional
+            normalize the difference by |v0| of the reference, by default False
+
+        Returns
+        -------
+        np.ndarray
+            conductivity change on the elements of shape (n_elems,) or (n_frames, n_elems)
+        """
+        v1 = pot_mat_to_meas(pot_mat, self.protocol)
+        v0 = pot_mat_to_meas(ref_pot_mat, self.protocol)
+        dv = v1 - v0
+        if normalize:
+            dv = dv / np.abs(v0)
+        return dv @ self.R
+
+
+class ReconstructionStage:
+    """
+    Real-time reconstruction stage fed with potential matrices from live acquisition.
+    Frames are queued by submit() without blocking the acquisition; a worker thread reconstructs them
+    with the precomputed reconstruction matrix and publishes the images. If the worker falls behind,
+    all queued frames (up to max_batch) are reconstructed in one batched matrix product.
+    If the queue is full the oldest frame is dropped and counted.
+
+    Since it has a submit() method, it can be passed to EIT_16_32_64_128.run_acquisition.
+
+    Parameters
+    ----------
+    reconstructor : LinearReconstructor
+        reconstructor with the precomputed matrix
+    ref_pot_mat : np.ndarray
+        reference potential matrix of shape (n_inj, n_el)
+    publish_fn : Callable
+        called with the images of shape (n_frames, n_elems) and their submit times
+    maxsize : int, optional
+        queued frames before frames are dropped, by default 64
+    max_batch : int, optional
+        maximum frames per batched reconstruction, by default 32
+    normalize : bool, optional
+        normalize the difference by |v0| of the reference, by default False
+    """
+
+    def __init__(
+        self,
+        reconstructor: LinearReconstructor,
+        ref_pot_mat: np.ndarray,
+        publish_fn: Callable,
+        maxsize: int = 64,
+        max_batch: int = 32,
+        normalize: bool = False,
+    ) -> None:
+        self.reconstructor = reconstructor
+        self.v0 = pot_mat_to_meas(ref_pot_mat, reconstructor.protocol)
+        self.scale = 1 / np.abs(self.v0) if normalize else None
+        self.publish_fn = publish_fn
+        self.max_batch = max_batch
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.n_frames = 0
+        self.n_dropped = 0
+        self.n_batches = 0
+        self.latency_last = 0.0
+        self.latency_max = 0.0
+        self.latency_sum = 0.0
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def submit(self, pot_mat: np.ndarray) -> None:
+        """
+        Queues a potential matrix (n_inj, n_el) or a burst of them (burst_count, n_inj, n_el).
+        """
+        pot_mat = np.asarray(pot_mat)
+        frames = pot_mat[np.newaxis] if pot_mat.ndim == 2 else pot_mat
+        now = time.perf_counter()
+        for frame in frames:
+            while True:
+                try:
+                    self.queue.put_nowait((frame, now))
+                    break
+                except queue.Full:
+                    try:
+                        self.queue.get_nowait()
+                        self.n_dropped += 1
+                    except queue.Empty:
+                        pass
+
+    def _run(self) -> None:
+        while self.running or not self.queue.empty():
+            try:
+                batch = [self.queue.get(timeout=0.1)]
+            except queue.Empty:
+                continue
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            frames = np.stack([frame for frame, _ in batch])
+            submit_times = np.array([t for _, t in batch])
+            dv = pot_mat_to_meas(frames, self.reconstructor.protocol) - self.v0
+            if self.scale is not None:
+                dv = dv * self.scale
+            images = dv @ self.reconstructor.R
+            try:
+                self.publish_fn(images, submit_times)
+            except Exception as e:
+                print(f"Publishing images failed: {e}")
+            latency = time.perf_counter() - submit_times.min()
+            self.latency_last = latency
+            self.latency_max = max(self.latency_max, latency)
+            self.latency_sum += latency * len(batch)
+            self.n_frames += len(batch)
+            self.n_batches += 1
+
+    def metrics(self) -> dict:
+        """
+        Returns processed and dropped frames, queue depth and latencies in s.
+        """
+        return {
+            "n_frames": self.n_frames,
+            "n_dropped": self.n_dropped,
+            "n_batches": self.n_batches,
+            "queue_depth": self.queue.qsize(),
+            "latency_last": self.latency_last,
+            "latency_mean": self.latency_sum / max(self.n_frames, 1),
+            "latency_max": self.latency_max,
+        }
+
+    def close(self) -> None:
+        """
+        Reconstructs the queued frames and stops the worker thread.
+        """
+        self.running = False
+        self.thread.join()
+
+    def __enter__(self) -> "ReconstructionStage":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
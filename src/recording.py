@@ -0,0 +1,250 @@
+""" Chunked long-term recording of potential matrices with a time index"""
+
+import os
+import json
+import struct
+import zlib
+import numpy as np
+from typing import Tuple, Union
+
+
+CHUNK_MAGIC = b"EITC"
+# magic, number of frames, compressed, payload length, first timestamp, last timestamp, crc32 of the payload
+CHUNK_HEADER = struct.Struct("<4sIBIddI")
+
+
+def scan_chunks(fname: str) -> Tuple[list, int]:
+    """
+    Reads the chunk headers of a recording file without touching the payloads.
+    Scanning stops at the first incomplete chunk. Since every chunk is synced to disk before the next
+    one is written, only the last chunk can be torn by a power loss, so only its checksum is verified.
+
+    Parameters
+    ----------
+    fname : str
+        recording file
+
+    Returns
+    -------
+    Tuple[list, int]
+        list of (offset, n_frames, compressed, payload_len, t_first, t_last, crc) and the end of the last valid chunk
+    """
+    chunks = []
+    end = 0
+    if not os.path.exists(fname):
+        return chunks, end
+    size = os.path.getsize(fname)
+    with open(fname, "rb") as f:
+        while end + CHUNK_HEADER.size <= size:
+            f.seek(end)
+            magic, n_frames, compressed, payload_len, t_first, t_last, crc = CHUNK_HEADER.unpack(
+                f.read(CHUNK_HEADER.size)
+            )
+            payload_end = end + CHUNK_HEADER.size + payload_len
+            if magic != CHUNK_MAGIC or payload_end > size:
+                break
+            chunks.append((end, n_frames, compressed, payload_len, t_first, t_last, crc))
+            end = payload_end
+        if chunks:
+            offset, _, _, payload_len, _, _, crc = chunks[-1]
+            f.seek(offset + CHUNK_HEADER.size)
+            if crc != zlib.crc32(f.read(payload_len)):
+                chunks.pop()
+                end = offset
+    return chunks, end
+
+
+class RecordingWriter:
+    """
+    Append-only writer of a chunked recording.
+    Frames are buffered and written as one chunk of chunk_size frames, optionally zlib compressed,
+    together with their timestamps. Every chunk is flushed to disk, so after a crash or power loss
+    the recording is readable up to the last complete chunk. Reopening a recording continues it.
+
+    Parameters
+    ----------
+    path : str
+        directory of the recording
+    frame_shape : tuple, optional
+        shape of a single frame, e.g. (n_el, n_el); required for a new recording
+    dtype : Union[str, np.dtype], optional
+        dtype of the stored frames, by default "complex64" (float32 real and imaginary part)
+    chunk_size : int, optional
+        frames per chunk, by default 256
+    compress : bool, optional
+        zlib compression of the chunks, by default True
+    """
+
+    def __init__(
+        self,
+        path: str,
+        frame_shape: tuple = None,
+        dtype: Union[str, np.dtype] = "complex64",
+        chunk_size: int = 256,
+        compress: bool = True,
+    ) -> None:
+        self.path = path
+        self.fname = os.path.join(path, "chunks.bin")
+        meta_path = os.path.join(path, "meta.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+        else:
+            if frame_shape is None:
+                raise ValueError("frame_shape is required for a new recording.")
+            os.makedirs(path, exist_ok=True)
+            meta = {"frame_shape": list(frame_shape), "dtype": np.dtype(dtype).str}
+            # written atomically, a torn meta.json would make the whole recording unreadable
+            tmp_path = f"{meta_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(meta, f)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, meta_path)
+        self.frame_shape = tuple(meta["frame_shape"])
+        self.dtype = np.dtype(meta["dtype"])
+        self.chunk_size = chunk_size
+        self.compress = compress
+
+        # drop an incomplete tail chunk before appending
+        _, end = scan_chunks(self.fname)
+        self.file = open(self.fname, "ab")
+        self.file.truncate(end)
+        self.frames = []
+        self.timestamps = []
+
+    def write(self, frame: np.ndarray, timestamp: float) -> None:
+        """
+        Appends a single frame.
+
+        Parameters
+        ----------
+        frame : np.ndarray
+            frame of shape frame_shape
+        timestamp : float
+            timestamp of the frame, e.g. SingleFrame.timestamp in ms
+        """
+        if np.shape(frame) != self.frame_shape:
+            raise ValueError(f"Frame shape {np.shape(frame)} does not match {self.frame_shape}.")
+        # copy, the caller may reuse its buffer before the chunk is written
+        self.frames.append(np.array(frame, dtype=self.dtype))
+        self.timestamps.append(timestamp)
+        if len(self.frames) >= self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes the buffered frames as one chunk.
+        """
+        if len(self.frames) == 0:
+            return
+        timestamps = np.asarray(self.timestamps, dtype=np.float64)
+        payload = timestamps.tobytes() + np.asarray(self.frames, dtype=self.dtype).tobytes()
+        if self.compress:
+            payload = zlib.compress(payload, 1)
+        header = CHUNK_HEADER.pack(
+            CHUNK_MAGIC,
+            len(self.frames),
+            int(self.compress),
+            len(payload),
+            timestamps.min(),
+            timestamps.max(),
+            zlib.crc32(payload),
+        )
+        self.file.write(header + payload)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.frames = []
+        self.timestamps = []
+
+    def close(self) -> None:
+        self.flush()
+        self.file.close()
+
+    def __enter__(self) -> "RecordingWriter":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+
+class RecordingReader:
+    """
+    Reader of a chunked recording.
+    Only the chunk headers are read on creation; range queries decompress the chunks they touch.
+
+    Parameters
+    ----------
+    path : str
+        directory of the recording
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.fname = os.path.join(path, "chunks.bin")
+        with open(os.path.join(path, "meta.json"), "r") as f:
+            meta = json.load(f)
+        self.frame_shape = tuple(meta["frame_shape"])
+        self.dtype = np.dtype(meta["dtype"])
+        self.refresh()
+
+    def refresh(self) -> None:
+        """
+        Re-reads the chunk index, e.g. while the recording is still being written.
+        """
+        chunks, _ = scan_chunks(self.fname)
+        self.chunks = chunks
+        self.t_first = np.array([chunk[4] for chunk in chunks])
+        self.t_last = np.array([chunk[5] for chunk in chunks])
+
+    def __len__(self) -> int:
+        return sum(chunk[1] for chunk in self.chunks)
+
+    def read_chunk(self, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Decodes chunk k.
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            timestamps and frames of the chunk
+        """
+        offset, n_frames, compressed, payload_len, _, _, _ = self.chunks[k]
+        with open(self.fname, "rb") as f:
+            f.seek(offset + CHUNK_HEADER.size)
+            payload = f.read(payload_len)
+        if zlib.crc32(payload) != self.chunks[k][6]:
+            raise ValueError(f"Chunk {k} of {self.fname} is corrupt.")
+        if compressed:
+            payload = zlib.decompress(payload)
+        timestamps = np.frombuffer(payload, dtype=np.float64, count=n_frames)
+        frames = np.frombuffer(payload, dtype=self.dtype, offset=timestamps.nbytes)
+        return timestamps, frames.reshape(n_frames, *self.frame_shape)
+
+    def read_range(self, t0: float, t1: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns all frames with t0 <= timestamp <= t1.
+
+        Parameters
+        ----------
+        t0 : float
+            start time
+        t1 : float
+            stop time
+
+        Returns
+        -------
+        Tuple[np.ndarray, np.ndarray]
+            timestamps and frames of shape (n, *frame_shape)
+        """
+        touched = np.flatnonzero((self.t_last >= t0) & (self.t_first <= t1))
+        timestamps = []
+        frames = []
+        for k in touched:
+            ts, fr = self.read_chunk(k)
+            mask = (ts >= t0) & (ts <= t1)
+            timestamps.append(ts[mask])
+            frames.append(fr[mask])
+        if len(touched) == 0:
+            return np.empty(0), np.empty((0, *self.frame_shape), dtype=self.dtype)
+        return np.concatenate(timestamps), np.concatenate(frames)
@@ -45,6 +45,9 @@ class EisMeasurementSetup:
     #Active time stamp in ms
     time_stamp_ms: int
 
+    #Active current range output (0x97 option 0x04)
+    current_range: int = 0
+
     #Active time stamp in ms
     #time_stamp_us: np.uint32
 
@@ -73,6 +76,29 @@ class EisMeasurementSetup:
 
 
 
+@dataclass
+class EisFrame:
+    """
+    This class is for parsing a single ISX-3 frequency point (0xB8 data frame).
+
+    Parameters
+    ----------
+    id : int
+        ID number of the frequency point (row of the setup)
+    timestamp : int
+        time stamp in ms or us, None if disabled
+    current_range : int
+        current range of the frequency point, None if disabled
+    impedance : complex
+        complex impedance of the frequency point
+    """
+
+    id: int
+    timestamp: Union[int, None]
+    current_range: Union[int, None]
+    impedance: complex
+
+
 @dataclass
 class SingleFrame:
     """
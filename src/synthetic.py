@@ -0,0 +1,219 @@
+""" Parallel generation of simulated training data"""
+
+import os
+import time
+import numpy as np
+import scipy.sparse as sparse
+import scipy.sparse.linalg as splinalg
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Tuple, Union
+
+from pyeit.mesh import PyEITMesh
+from pyeit.eit.fem import calculate_ke
+
+from .catalog import Catalog
+from .dataset_store import DatasetStore
+from .injection_patterns import injection_pattern
+from .meshing import circle_perm_labels, create_empty_2d_mesh
+
+
+class ForwardSimulator:
+    """
+    FEM forward model returning potential matrices like EIT_16_32_64_128.get_data_as_matrix:
+    row i holds the potentials of all electrodes during injection i of the injection pattern
+    (see injection_patterns.injection_pattern). The element stiffness matrices and the sparsity
+    pattern are computed once; a sample is one vectorized assembly, one sparse LU factorization
+    and one solve with all injections as right-hand sides.
+
+    Parameters
+    ----------
+    mesh_obj : PyEITMesh
+        mesh object, electrode k + 1 is mesh_obj.el_pos[k]
+    n_el : int, optional
+        number of electrodes, by default 16
+    inj_skip : Union[int, list], optional
+        injection pattern as in EitMeasurementSetup.inj_skip, by default 0
+    """
+
+    def __init__(
+        self, mesh_obj: PyEITMesh, n_el: int = 16, inj_skip: Union[int, list] = 0
+    ) -> None:
+        self.mesh_obj = mesh_obj
+        self.n_el = n_el
+        self.el_pos = np.asarray(mesh_obj.el_pos)[:n_el]
+        self.ke = calculate_ke(mesh_obj.node, mesh_obj.element)
+        tri = mesh_obj.element
+        n_vertices = tri.shape[1]
+        row = np.repeat(tri, n_vertices).ravel()
+        col = np.repeat(tri, n_vertices, axis=0).ravel()
+        ref = mesh_obj.ref_node
+        # the reference node is grounded (Dirichlet), as in pyeit.eit.fem.assemble
+        self.keep = (row != ref) & (col != ref)
+        self.row = np.append(row[self.keep], ref)
+        self.col = np.append(col[self.keep], ref)
+        self.n_nodes = mesh_obj.n_nodes
+
+        el_inj, el_gnd = (injection_pattern(n_el, inj_skip) - 1).T
+        rows = np.arange(len(el_inj))
+        self.b = np.zeros((self.n_nodes, len(el_inj)))
+        self.b[self.el_pos[el_inj], rows] = 1
+        self.b[self.el_pos[el_gnd], rows] = -1
+
+    def simulate(self, perm: np.ndarray) -> np.ndarray:
+        """
+        Simulates the potential matrix of a permittivity distribution.
+
+        Parameters
+        ----------
+        perm : np.ndarray
+            permittivity on the elements of shape (n_elems,)
+
+        Returns
+        -------
+        np.ndarray
+            potential matrix of shape (n_inj, n_el)
+        """
+        data = (self.ke * np.asarray(perm)[:, np.newaxis, np.newaxis]).ravel()
+        data = np.append(data[self.keep], 1.0)
+        kg = sparse.csc_matrix((data, (self.row, self.col)), shape=(self.n_nodes, self.n_nodes))
+        potentials = splinalg.splu(kg).solve(self.b)
+        return potentials[self.el_pos].T.astype(complex)
+
+
+def anomaly_grid(
+    x_grid: np.ndarray, y_grid: np.ndarray, radii: np.ndarray, perms: np.ndarray
+) -> np.ndarray:
+    """
+    All combinations of anomaly position, radius and permittivity with the anomaly inside the tank.
+
+    Returns
+    -------
+    np.ndarray
+        parameters of shape (n_samples, 4) with the columns x, y, radius, perm
+    """
+    grid = np.meshgrid(x_grid, y_grid, radii, perms, indexing="ij")
+    params = np.stack(grid, axis=-1).reshape(-1, 4)
+    return params[np.hypot(params[:, 0], params[:, 1]) + params[:, 2] <= 1]
+
+
+_worker = {}
+
+
+def _init_worker(n_el: int, h0: float, inj_skip: Union[int, list], empty_perm: float) -> None:
+    # one cached mesh and forward model per worker process
+    mesh_obj = create_empty_2d_mesh(n_el=n_el, h0=h0, default_perm=empty_perm)
+    _worker["centers"] = mesh_obj.elem_centers
+    _worker["fwd"] = ForwardSimulator(mesh_obj, n_el, inj_skip)
+    _worker["empty_perm"] = empty_perm
+
+
+def simulate_chunk(params: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Simulates a chunk of anomaly parameters in a worker initialized by _init_worker.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, np.ndarray]
+        potential matrices (n, n_inj, n_el), perm labels (n, n_elems) and the parameters
+    """
+    fwd = _worker["fwd"]
+    labels = np.empty((len(params), fwd.mesh_obj.n_elems), dtype=np.float32)
+    for perm in np.unique(params[:, 3]):
+        sel = params[:, 3] == perm
+        labels[sel] = circle_perm_labels(
+            _worker["centers"], params[sel, :2], params[sel, 2], _worker["empty_perm"], perm
+        )
+    pot_mats = np.array([fwd.simulate(label) for label in labels])
+    return pot_mats, labels, params
+
+
+def generate_synthetic_dataset(
+    path: str,
+    x_grid: np.ndarray,
+    y_grid: np.ndarray,
+    radii: np.ndarray,
+    perms: np.ndarray,
+    n_el: int = 16,
+    h0: float = 0.05,
+    inj_skip: Union[int, list] = 0,
+    empty_perm: float = 1.0,
+    chunk_size: int = 256,
+    n_workers: int = None,
+    catalog: Catalog = None,
+) -> Tuple[DatasetStore, DatasetStore]:
+    """
+    Simulates circle anomalies over a parameter grid on a process pool and streams the results
+    into two DatasetStores: path/pot_mat with the potential matrices and the anomaly parameters
+    as header, and path/perm with the perm labels on the mesh elements, in the same order.
+    At most two chunks per worker are in flight, so memory stays bounded for any grid size.
+
+    Parameters
+    ----------
+    path : str
+        directory of the dataset
+    x_grid : np.ndarray
+        anomaly x-positions relating the unit circle
+    y_grid : np.ndarray
+        anomaly y-positions relating the unit circle
+    radii : np.ndarray
+        anomaly radii relating the unit circle
+    perms : np.ndarray
+        anomaly permittivities
+    n_el : int, optional
+        number of electrodes, by default 16
+    h0 : float, optional
+        mesh refinement, by default 0.05
+    inj_skip : Union[int, list], optional
+        injection pattern as in EitMeasurementSetup.inj_skip, by default 0
+    empty_perm : float, optional
+        permittivity of the empty area, by default 1.0
+    chunk_size : int, optional
+        samples per worker task, by default 256
+    n_workers : int, optional
+        number of processes, by default os.cpu_count()
+    catalog : Catalog, optional
+        catalog of the potential matrices (object, size and n_el), by default None
+
+    Returns
+    -------
+    Tuple[DatasetStore, DatasetStore]
+        potential matrix store and perm label store
+    """
+    params = anomaly_grid(x_grid, y_grid, radii, perms)
+    n_elems = create_empty_2d_mesh(n_el=n_el, h0=h0).n_elems
+    header_dtype = [("x", "f8"), ("y", "f8"), ("radius", "f8"), ("perm", "f8")]
+    n_inj = len(injection_pattern(n_el, inj_skip))
+    pot_store = DatasetStore.create(
+        os.path.join(path, "pot_mat"), (n_inj, n_el), "complex128", header_dtype, catalog=catalog
+    )
+    perm_store = DatasetStore.create(
+        os.path.join(path, "perm"), (n_elems,), "float32", header_dtype
+    )
+
+    def store(result: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> None:
+        pot_mats, labels, chunk = result
+        headers = [dict(zip(("x", "y", "radius", "perm"), row)) for row in chunk]
+        configs = [{"object": "circle", "size": row[2], "n_el": n_el} for row in chunk]
+        pot_store.extend(pot_mats, headers, configs)
+        perm_store.extend(labels, headers)
+
+    start = time.perf_counter()
+    chunks = [params[i : i + chunk_size] for i in range(0, len(params), chunk_size)]
+    n_workers = n_workers or os.cpu_count()
+    with ProcessPoolExecutor(
+        max_workers=n_workers, initializer=_init_worker, initargs=(n_el, h0, inj_skip, empty_perm)
+    ) as pool:
+        pending = set()
+        for chunk in chunks:
+            if len(pending) >= 2 * n_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    store(future.result())
+            pending.add(pool.submit(simulate_chunk, chunk))
+        for future in pending:
+            store(future.result())
+
+    seconds = max(time.perf_counter() - start, 1e-9)
+    print(f"simulated: {len(pot_store)} samples | {len(pot_store) / seconds:.1f} samples/s")
+    print("\t Saved in", path)
+    return pot_store, perm_store
@@ -0,0 +1,9 @@
+import os
+import sys
+
+# the package modules are imported as src.<module>, the device modules (ISX_3, com_util)
+# use absolute imports of their siblings
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (root, os.path.join(root, "src")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
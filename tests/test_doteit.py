@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from src.doteit import LazyDotEit, doteit_in_array, header_keys
+
+
+def write_doteit(path, n_values: list) -> str:
+    lines = ["18", "1", "setup", "2024", "100", "1000", "0", "1", "0.01", "1", "0"]
+    lines += ["a", "b", "c", "d", "e", "4", "1"]
+    assert len(lines) == len(header_keys)
+    for k, n in enumerate(n_values):
+        lines.append(f"{k + 1} {k + 2}")
+        lines.append("\t".join(f"{k + 0.5 * i:E}" for i in range(n)))
+    fname = str(path / "setup.eit")
+    with open(fname, "w") as f:
+        f.write("\n".join(lines) + "\n")
+    return fname
+
+
+def test_lazy_and_eager_reader_agree(tmp_path):
+    fname = write_doteit(tmp_path, [8, 8, 8])
+    with open(fname, "r") as f:
+        _, el_cmbs, data = doteit_in_array(f.read().split("\n"))
+    lazy = LazyDotEit(fname)
+    assert lazy.el_cmbs == el_cmbs == ["1_2", "2_3", "3_4"]
+    for k, el_cmb in enumerate(el_cmbs):
+        assert np.array_equal(lazy[el_cmb], data[k])
+
+
+@pytest.mark.parametrize("n_values", [[8, 6, 10], [7, 7, 7]])
+def test_lazy_and_eager_reader_reject_ragged_blocks(tmp_path, n_values):
+    fname = write_doteit(tmp_path, n_values)
+    with open(fname, "r") as f:
+        content = f.read().split("\n")
+    with pytest.raises(ValueError):
+        doteit_in_array(content)
+    with pytest.raises(ValueError):
+        LazyDotEit(fname)["1_2"]
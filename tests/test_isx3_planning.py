@@ -0,0 +1,65 @@
+from dataclasses import replace
+
+import pytest
+
+from ISX_3 import ISX_3
+from sciopy_dataclasses import EisFrame, FreqList
+
+
+class CalibratedISX3(ISX_3):
+    """
+    ISX_3 without a device: a precision p costs (1 + p) ms per point and gives a relative noise of 0.01 / 2**p.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.time_stamp_len = 4
+
+    def SetSetup(self, EisSetup) -> None:
+        self.setup = EisSetup
+
+    def StartMeasure(self, EisSetup) -> list:
+        block = EisSetup.freq_list
+        point_ms = 1 + int(block.precision)
+        sigma = 100 * 0.01 / 2**block.precision
+        frames = []
+        for r in range(EisSetup.repeat):
+            for s in range(block.steps):
+                frames.append(
+                    EisFrame(
+                        id=s + 1,
+                        timestamp=(r * block.steps + s) * point_ms,
+                        current_range=None,
+                        impedance=complex(100 + (sigma if r % 2 == 0 else -sigma), 0),
+                    )
+                )
+        return frames
+
+
+def bands():
+    band = FreqList(100, 1000, 100, 0, 0.0, 0.1, 0.001, 0, 1, 1)
+    return [(band, 0.003), (replace(band, steps=10), 0.003)]
+
+
+def test_plan_meets_targets_within_budget():
+    isx = CalibratedISX3()
+    planned, noise = isx.PlanFreqBlocks(bands(), time_budget=1.0, calib_repeat=4)
+    assert [block.precision for block in planned] == [2.0, 2.0]
+    assert noise == pytest.approx([0.0025, 0.0025])
+    assert isx.sweep_duration == pytest.approx(0.33)
+
+
+def test_plan_lowers_most_expensive_block_to_fit_budget():
+    isx = CalibratedISX3()
+    planned, noise = isx.PlanFreqBlocks(bands(), time_budget=0.25, calib_repeat=4)
+    assert [block.precision for block in planned] == [1.0, 2.0]
+    assert noise == pytest.approx([0.005, 0.0025])
+    assert isx.sweep_duration <= 0.25
+
+
+def test_plan_returns_fastest_settings_if_budget_is_too_short():
+    isx = CalibratedISX3()
+    planned, noise = isx.PlanFreqBlocks(bands(), time_budget=0.05, calib_repeat=4)
+    assert [block.precision for block in planned] == [0.0, 0.0]
+    assert noise == pytest.approx([0.01, 0.01])
+    assert isx.sweep_duration == pytest.approx(0.11)
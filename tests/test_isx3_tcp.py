@@ -0,0 +1,129 @@
+import socket
+import struct
+import threading
+
+import numpy as np
+import pytest
+
+from ISX_3 import ISX_3
+from sciopy_dataclasses import EisMeasurementSetup, FreqList
+
+
+ACK = bytes([0x18, 0x01, 0x83, 0x18])
+IMPEDANCES = [complex(100.0, -5.0), complex(80.5, -2.25), complex(60.0, 1.5)]
+
+
+def eis_frame(point_id: int, z: complex) -> bytes:
+    return bytes([0xB8, 0x0A]) + struct.pack(">Hff", point_id, z.real, z.imag) + bytes([0xB8])
+
+
+class StandInServer:
+    """
+    Local TCP stand-in of the ISX-3 Ethernet interface.
+    Records every received command and answers with the device reply and an ACK.
+    """
+
+    def __init__(self) -> None:
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(1)
+        self.port = self.sock.getsockname()[1]
+        self.commands = []
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def reply(self, command: bytes) -> bytes:
+        if command[0] == 0xB8:
+            return ACK + b"".join(eis_frame(i + 1, z) for i, z in enumerate(IMPEDANCES)) + ACK
+        if command[0] == 0xBA:
+            return bytes([0xBA, 0x04]) + struct.pack(">I", 250_000) + bytes([0xBA]) + ACK
+        if command[:3] == bytes([0xCF, 0x01, 0x02]):
+            return bytes([0xCF, 0x05, 0x02]) + struct.pack(">I", 5000) + bytes([0xCF]) + ACK
+        return ACK
+
+    def serve(self) -> None:
+        conn, _ = self.sock.accept()
+        with conn:
+            # TCP-Socket message on a new connection
+            conn.sendall(bytes([0x18, 0x01, 0x11, 0x18]))
+            while True:
+                command = conn.recv(4096)
+                if not command:
+                    break
+                self.commands.append(command)
+                conn.sendall(self.reply(command))
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+@pytest.fixture
+def device():
+    server = StandInServer()
+    isx = ISX_3()
+    isx.connect_device_TCP("127.0.0.1", server.port, timeout=0.2)
+    yield isx, server
+    isx.device.close()
+    server.thread.join(timeout=2)
+    server.close()
+
+
+def test_start_measure_over_tcp(device):
+    isx, server = device
+    freq_list = FreqList(100, 1000, 3, 0, 1.0, 0.1, 0.001, 0, 1, 1)
+    frames = isx.StartMeasure(EisMeasurementSetup(freq_list=freq_list, repeat=1, time_stamp_ms=0))
+    assert server.commands[-1] == bytes([0xB8, 0x03, 0x01, 0x00, 0x01, 0xB8])
+    assert [frame.id for frame in frames] == [1, 2, 3]
+    assert np.allclose([frame.impedance for frame in frames], IMPEDANCES)
+
+
+def test_get_sync_time_over_tcp(device):
+    isx, server = device
+    assert isx.GetSyncTime() == pytest.approx(0.25)
+    assert server.commands[-1] == bytes([0xBA, 0x00, 0xBA])
+
+
+def test_ethernet_configuration_and_watchdog_commands(device):
+    isx, server = device
+    isx.SetEthernetConfiguration(ip_address="192.168.1.2", dhcp=False)
+    isx.GetEthernetConfiguration()
+    isx.SetTCPWatchdog(5000)
+    isx.GetTCPWatchdog()
+    assert server.commands == [
+        bytes([0xBD, 0x05, 0x01, 192, 168, 1, 2, 0xBD]),
+        bytes([0xBD, 0x02, 0x03, 0x00, 0xBD]),
+        bytes([0xBE, 0x01, 0x01, 0xBE]),
+        bytes([0xBE, 0x01, 0x02, 0xBE]),
+        bytes([0xBE, 0x01, 0x03, 0xBE]),
+        bytes([0xCF, 0x05, 0x01, 0x00, 0x00, 0x13, 0x88, 0xCF]),
+        bytes([0xCF, 0x01, 0x02, 0xCF]),
+    ]
+    with pytest.raises(ValueError):
+        isx.SetEthernetConfiguration(ip_address="192.168.1.256")
+
+
+def test_tcp_read_takes_buffered_bytes(device):
+    isx, _ = device
+    expected = bytes([0xBA, 0x04, 0x00, 0x03, 0xD0, 0x90, 0xBA]) + ACK
+    isx.device.write(bytes([0xBA, 0x00, 0xBA]))
+    data = b""
+    n_reads = 0
+    while len(data) < len(expected):
+        data += isx.device.read(max(isx.device.in_waiting, 1))
+        n_reads += 1
+    assert data == expected
+    assert n_reads < len(expected)
+
+
+def test_set_sync_time_rejects_invalid_values(device):
+    isx, server = device
+    isx.sweep_duration = 0.5
+    isx.SetSyncTime(1.0)
+    assert server.commands[-1] == bytes([0xB9, 0x04, 0x00, 0x0F, 0x42, 0x40, 0xB9])
+    n_commands = len(server.commands)
+    with pytest.raises(ValueError):
+        isx.SetSyncTime(0.25)
+    with pytest.raises(ValueError):
+        isx.SetSyncTime(200)
+    assert len(server.commands) == n_commands
+    assert isx.sync_time == 1.0
@@ -0,0 +1,19 @@
+import numpy as np
+
+from src.synthetic import anomaly_grid
+
+
+def test_anomaly_grid_inside_tank():
+    cases = [
+        (np.linspace(-0.6, 0.6, 5), [0.2]),
+        (np.linspace(-0.9, 0.9, 19), [0.05, 0.2, 0.4]),
+    ]
+    for grid, radii in cases:
+        params = anomaly_grid(grid, grid, radii, [5.0, 10.0])
+        assert len(params) > 0
+        assert np.all(np.hypot(params[:, 0], params[:, 1]) + params[:, 2] <= 1)
+
+
+def test_anomaly_grid_keeps_touching_anomaly():
+    params = anomaly_grid([0.0, 0.8], [0.0], [0.2], [10.0])
+    assert np.array_equal(params[:, 0], [0.0, 0.8])